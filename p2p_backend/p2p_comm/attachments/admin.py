@@ -0,0 +1,20 @@
+from django.contrib import admin
+from .models import Attachment, StoredFile, UploadSession
+
+
+@admin.register(StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = ("id","sha256","size","content_type","created_at")
+    search_fields = ("sha256__exact",)
+
+@admin.register(Attachment)
+class AttachmentAdmin(admin.ModelAdmin):
+    list_display = ("id","owner","filename","file","created_at")
+    list_select_related = ("owner", "file")
+    raw_id_fields = ("owner", "file")
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ("id","owner","filename","received","size","updated_at")
+    list_select_related = ("owner",)
+    raw_id_fields = ("owner",)
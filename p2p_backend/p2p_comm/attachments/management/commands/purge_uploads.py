@@ -0,0 +1,35 @@
+# attachments/management/commands/purge_uploads.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from attachments.models import Attachment, StoredFile, UploadSession
+from attachments.uploads import attachment_settings, discard, stored_path
+
+
+class Command(BaseCommand):
+    help = "Delete idle upload sessions older than ATTACHMENTS['SESSION_TTL'] and stored files nobody references (run from cron)."
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        stale = UploadSession.objects.filter(updated_at__lt=now - timedelta(seconds=attachment_settings()["SESSION_TTL"]))
+        sessions = 0
+        for session in stale.iterator():
+            discard(session)
+            sessions += 1
+
+        # the grace period covers a complete() that has stored the file but not yet created its Attachment
+        orphans = StoredFile.objects.filter(attachments__isnull=True, created_at__lt=now - timedelta(hours=1))
+        files = 0
+        for pk in list(orphans.values_list("pk", flat=True)):
+            with transaction.atomic():
+                # complete() holds this lock while it attaches an existing file; re-check once we have it
+                stored = StoredFile.objects.select_for_update().filter(pk=pk).first()
+                if stored is None or Attachment.objects.filter(file=stored).exists():
+                    continue
+                stored.delete()
+                stored_path(stored.sha256).unlink(missing_ok=True)
+            files += 1
+        self.stdout.write(self.style.SUCCESS(f"Removed {sessions} stale upload(s) and {files} unreferenced file(s)."))
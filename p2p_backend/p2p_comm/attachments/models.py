@@ -0,0 +1,45 @@
+# attachments/models.py
+import uuid
+
+from django.db import models
+from django.conf import settings
+
+
+class StoredFile(models.Model):
+    """Content-addressed file on disk (see attachments/uploads.py); identical uploads share one row."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField()
+    content_type = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"StoredFile<{self.sha256[:12]} {self.size}B>"
+
+
+class Attachment(models.Model):
+    """A user's handle on a stored file, referenced by posts and messages by id."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="attachments")
+    file = models.ForeignKey(StoredFile, on_delete=models.PROTECT, related_name="attachments")
+    filename = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Attachment<{self.filename}>"
+
+
+class UploadSession(models.Model):
+    """An upload in progress; `received` bytes are already on disk and the client resumes from there."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)  # optional, checked on completion
+    attachment = models.OneToOneField(Attachment, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"UploadSession<{self.filename} {self.received}/{self.size}>"
@@ -0,0 +1,52 @@
+# attachments/serializers.py
+from rest_framework import serializers
+
+from .models import Attachment, UploadSession
+from .uploads import attachment_settings
+
+
+class UploadStartSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    content_type = serializers.CharField(max_length=100)
+    size = serializers.IntegerField(min_value=1)
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$", required=False, default="")
+
+    def validate_content_type(self, value):
+        if value not in attachment_settings()["ALLOWED_TYPES"]:
+            raise serializers.ValidationError("Unsupported file type.")
+        return value
+
+    def validate_size(self, value):
+        limit = attachment_settings()["MAX_SIZE"]
+        if value > limit:
+            raise serializers.ValidationError(f"Files are limited to {limit} bytes.")
+        return value
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source="received", read_only=True)
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ["id", "filename", "content_type", "size", "offset", "chunk_size", "attachment"]
+        read_only_fields = ["attachment"]  # set once complete() has succeeded
+
+    def get_chunk_size(self, obj) -> int:
+        return attachment_settings()["CHUNK_SIZE"]
+
+
+class AttachmentSerializer(serializers.ModelSerializer):
+    size = serializers.IntegerField(source="file.size", read_only=True)
+    content_type = serializers.CharField(source="file.content_type", read_only=True)
+    sha256 = serializers.CharField(source="file.sha256", read_only=True)
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Attachment
+        fields = ["id", "filename", "size", "content_type", "sha256", "url", "created_at"]
+
+    def get_url(self, obj) -> str:
+        path = f"/api/attachments/{obj.pk}/"
+        request = self.context.get("request")
+        return request.build_absolute_uri(path) if request else path
@@ -0,0 +1,281 @@
+# attachments/uploads.py
+"""
+Resumable chunked uploads with content-addressed storage.
+
+  1. start_upload() creates an UploadSession for a declared size and type.
+  2. append_chunk() streams one request body to the session's partial file at
+     the client's Upload-Offset, updating a SHA-256 as it goes. Nothing larger
+     than READ_BLOCK is held in memory. After an interruption the client asks
+     for the session's offset and resumes from there.
+  3. complete() finishes the hash and moves the file to sha256/<ab>/<digest>. If
+     that content is already stored, the new copy is dropped and the existing
+     StoredFile is reused. The session keeps the new Attachment, so a retried
+     complete() (the client never saw the response) returns the same one.
+
+The running hash is kept in process, keyed by session and offset. A chunk that
+lands on another worker (or after a restart) re-hashes the partial file from
+disk once and continues from there. Each chunk holds a row lock on its session
+while it writes, so two clients racing on one session can't interleave bytes
+under a hash that doesn't match them; on a backend without row locks (SQLite)
+complete() doesn't trust the running hash and re-reads the file instead.
+complete() also locks the StoredFile it reuses until the new Attachment is
+committed, so purge_uploads can't delete it in between.
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Attachment, StoredFile, UploadSession
+
+DEFAULTS = {
+    "ROOT": None,                       # defaults to BASE_DIR / "uploads"
+    "MAX_SIZE": 100 * 1024 * 1024,      # bytes per file
+    "CHUNK_SIZE": 8 * 1024 * 1024,      # max bytes per PATCH
+    "SESSION_TTL": 24 * 3600,           # seconds an idle upload is kept (manage.py purge_uploads)
+    "ALLOWED_TYPES": [
+        "application/pdf", "image/jpeg", "image/png", "image/webp", "image/gif", "video/mp4", "video/webm",
+    ],
+}
+
+READ_BLOCK = 64 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def attachment_settings():
+    conf = {**DEFAULTS, **getattr(settings, "ATTACHMENTS", {})}
+    if conf["ROOT"] is None:
+        conf["ROOT"] = Path(settings.BASE_DIR) / "uploads"
+    return conf
+
+
+class UploadError(Exception):
+    pass
+
+
+class OffsetMismatch(UploadError):
+    def __init__(self, offset):
+        super().__init__(f"Expected Upload-Offset {offset}.")
+        self.offset = offset
+
+
+class PartialFileLost(OffsetMismatch):
+    pass
+
+
+class ChecksumMismatch(UploadError):
+    pass
+
+
+class UnsatisfiableRange(Exception):
+    pass
+
+
+def partial_path(session_id):
+    return Path(attachment_settings()["ROOT"]) / "partial" / f"{session_id}.part"
+
+
+def stored_path(sha256):
+    return Path(attachment_settings()["ROOT"]) / "sha256" / sha256[:2] / sha256
+
+
+class HashCache:
+    """Running SHA-256 per upload session, valid only at the offset it was saved with."""
+
+    def __init__(self, max_entries=1000):
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._entries = OrderedDict()  # session id -> (offset, hasher)
+
+    def take(self, session_id, offset):
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        if entry and entry[0] == offset:
+            return entry[1]
+        return None
+
+    def put(self, session_id, offset, hasher):
+        with self._lock:
+            self._entries[session_id] = (offset, hasher)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)  # the client's next chunk re-hashes from disk
+
+    def forget(self, session_id):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+
+hashers = HashCache()
+
+
+def _hash_file(path, length):
+    hasher = hashlib.sha256()
+    if length:
+        with open(path, "rb") as f:
+            while length:
+                block = f.read(min(READ_BLOCK, length))
+                if not block:
+                    break
+                hasher.update(block)
+                length -= len(block)
+    return hasher
+
+
+def start_upload(owner, filename, content_type, size, sha256=""):
+    return UploadSession.objects.create(
+        owner=owner, filename=filename, content_type=content_type, size=size, sha256=sha256.lower()
+    )
+
+
+def append_chunk(session, offset, stream, length):
+    """Write `length` bytes from `stream` at `offset`. Returns the new offset."""
+    if length > attachment_settings()["CHUNK_SIZE"]:
+        raise UploadError(f"Chunks are limited to {attachment_settings()['CHUNK_SIZE']} bytes.")
+    try:
+        with transaction.atomic():
+            # a second chunk for this session waits here until this one has written and committed
+            locked = UploadSession.objects.select_for_update().get(pk=session.pk)
+            new_offset = _write_chunk(locked, offset, stream, length)
+    except PartialFileLost as exc:
+        # rewind the session to what is really on disk (outside the rolled-back block)
+        UploadSession.objects.filter(pk=session.pk).update(received=exc.offset)
+        hashers.forget(session.pk)
+        raise
+    session.received = new_offset
+    return new_offset
+
+
+def _write_chunk(session, offset, stream, length):
+    if offset != session.received:
+        raise OffsetMismatch(session.received)
+    if offset + length > session.size:
+        raise UploadError("Chunk goes past the declared size.")
+
+    path = partial_path(session.pk)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    on_disk = path.stat().st_size if path.exists() else 0
+    if on_disk < offset:
+        raise PartialFileLost(on_disk)  # the partial file was lost or cut short
+    hasher = hashers.take(session.pk, offset) or _hash_file(path, offset)
+    with open(path, "r+b" if path.exists() else "wb") as f:
+        # drop bytes past the offset left by an interrupted chunk
+        f.seek(offset)
+        f.truncate()
+        remaining = length
+        while remaining:
+            block = stream.read(min(READ_BLOCK, remaining))
+            if not block:
+                break
+            f.write(block)
+            hasher.update(block)
+            remaining -= len(block)
+
+    new_offset = offset + length - remaining
+    # still conditional on the old offset: SQLite ignores the row lock, and two racers must not both advance it
+    updated = UploadSession.objects.filter(pk=session.pk, received=offset).update(
+        received=new_offset, updated_at=timezone.now()
+    )
+    if not updated:
+        raise OffsetMismatch(UploadSession.objects.values_list("received", flat=True).get(pk=session.pk))
+    hashers.put(session.pk, new_offset, hasher)
+    return new_offset
+
+
+def discard(session):
+    hashers.forget(session.pk)
+    partial_path(session.pk).unlink(missing_ok=True)
+    session.delete()
+
+
+def complete(session):
+    """
+    Verify and store a fully received upload, reusing identical content. Returns the
+    Attachment; completing an already completed session returns the same one.
+    """
+    with transaction.atomic():
+        if not connection.features.has_select_for_update:
+            # SQLite: take the database write lock up front, in place of the row lock below
+            UploadSession.objects.filter(pk=session.pk).update(updated_at=timezone.now())
+        # a retried complete() waits here for the first one, then finds its attachment
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.attachment_id is not None:
+            return Attachment.objects.select_related("file").get(pk=session.attachment_id)
+        if session.received != session.size:
+            raise OffsetMismatch(session.received)
+        path = partial_path(session.pk)
+        hasher = hashers.take(session.pk, session.size)
+        if hasher is None or not connection.features.has_select_for_update:
+            # without row locks, racing chunks may have left bytes the running hash never saw
+            hasher = _hash_file(path, session.size)
+        digest = hasher.hexdigest()
+        if not session.sha256 or session.sha256 == digest:
+            return _store(session, path, digest)
+    discard(session)
+    raise ChecksumMismatch(f"SHA-256 mismatch: got {digest}.")
+
+
+def _store(session, path, digest):
+    # locked until the Attachment below is committed; purge_uploads re-checks under the same lock
+    stored = StoredFile.objects.select_for_update().filter(sha256=digest).first()
+    if stored is None:
+        target = stored_path(digest)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, target)
+        stored, _ = StoredFile.objects.get_or_create(
+            sha256=digest, defaults={"size": session.size, "content_type": session.content_type}
+        )
+    else:
+        path.unlink(missing_ok=True)
+    attachment = Attachment.objects.create(owner_id=session.owner_id, file=stored, filename=session.filename)
+    # the finished session is kept (purge_uploads drops it after SESSION_TTL) so a retry gets this attachment
+    session.attachment = attachment
+    session.save(update_fields=["attachment", "updated_at"])
+    return attachment
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single "bytes=" range, or None to send the whole
+    file (no header, or several ranges). Raises UnsatisfiableRange.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise UnsatisfiableRange
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise UnsatisfiableRange
+    return start, end
+
+
+def iter_file(f, start, length):
+    try:
+        f.seek(start)
+        while length:
+            block = f.read(min(READ_BLOCK, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        f.close()
@@ -0,0 +1,10 @@
+# attachments/urls.py
+from django.urls import path
+from .views import UploadStartView, UploadChunkView, UploadCompleteView, AttachmentDownloadView
+
+urlpatterns = [
+    path("uploads/", UploadStartView.as_view(), name="upload-start"),
+    path("uploads/<uuid:pk>/", UploadChunkView.as_view(), name="upload-chunk"),
+    path("uploads/<uuid:pk>/complete/", UploadCompleteView.as_view(), name="upload-complete"),
+    path("<uuid:pk>/", AttachmentDownloadView.as_view(), name="attachment-download"),
+]
@@ -0,0 +1,185 @@
+# attachments/views.py
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import Attachment, UploadSession
+from .serializers import AttachmentSerializer, UploadSessionSerializer, UploadStartSerializer
+from .uploads import (
+    ChecksumMismatch, OffsetMismatch, UnsatisfiableRange, UploadError,
+    append_chunk, complete, discard, iter_file, parse_range, start_upload, stored_path,
+)
+
+
+def _offset_conflict(exc):
+    return Response(
+        {"detail": str(exc), "offset": exc.offset}, status=status.HTTP_409_CONFLICT,
+        headers={"Upload-Offset": str(exc.offset)},
+    )
+
+
+class UploadStartView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Start a resumable upload",
+        description="Declare the file; then PATCH chunks to the returned session and POST .../complete/. "
+                    "`sha256` is optional and verified on completion.",
+        request=UploadStartSerializer,
+        responses={201: UploadSessionSerializer, 400: OpenApiResponse(description="Validation error")},
+        tags=["Attachments"],
+    )
+    def post(self, request):
+        serializer = UploadStartSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = start_upload(request.user, **serializer.validated_data)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+
+class UploadChunkView(APIView):
+    """
+    GET    /api/attachments/uploads/<id>/   current offset (to resume)
+    PATCH  /api/attachments/uploads/<id>/   raw chunk body, Upload-Offset header
+    DELETE /api/attachments/uploads/<id>/   cancel
+    """
+    permission_classes = [IsAuthenticated]
+
+    def _session(self, request, pk):
+        return get_object_or_404(UploadSession, pk=pk, owner=request.user)
+
+    @extend_schema(
+        summary="Upload session status",
+        responses={200: UploadSessionSerializer},
+        tags=["Attachments"],
+    )
+    def get(self, request, pk):
+        session = self._session(request, pk)
+        return Response(UploadSessionSerializer(session).data, headers={"Upload-Offset": str(session.received)})
+
+    @extend_schema(
+        summary="Append a chunk",
+        description="Send raw bytes (Content-Type: application/offset+octet-stream) starting at the session's "
+                    "current offset. The body is streamed to disk, never buffered whole.",
+        parameters=[
+            OpenApiParameter(name="Upload-Offset", location=OpenApiParameter.HEADER, required=True, type=int,
+                             description="Byte offset of this chunk; must equal the session's offset"),
+        ],
+        request={"application/offset+octet-stream": OpenApiTypes.BINARY},
+        responses={
+            204: OpenApiResponse(description="Stored; the new offset is in the Upload-Offset header"),
+            409: OpenApiResponse(description='Wrong offset: {"detail": str, "offset": int}'),
+            400: OpenApiResponse(description="Missing or invalid headers, chunk too large"),
+        },
+        tags=["Attachments"],
+    )
+    def patch(self, request, pk):
+        session = self._session(request, pk)
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.headers.get("Content-Length") or 0)
+        except (KeyError, ValueError):
+            raise ValidationError({"detail": "Upload-Offset and Content-Length headers are required."})
+        if length <= 0 or request.stream is None:
+            raise ValidationError({"detail": "Empty chunk."})
+        try:
+            new_offset = append_chunk(session, offset, request.stream, length)
+        except OffsetMismatch as exc:
+            return _offset_conflict(exc)
+        except UploadError as exc:
+            raise ValidationError({"detail": str(exc)})
+        return Response(status=status.HTTP_204_NO_CONTENT, headers={"Upload-Offset": str(new_offset)})
+
+    @extend_schema(summary="Cancel an upload", responses={204: None}, tags=["Attachments"])
+    def delete(self, request, pk):
+        discard(self._session(request, pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadCompleteView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Finish an upload",
+        description="Verifies the size (and sha256 if given). Identical content already on the server is reused. "
+                    "Safe to retry: completing a finished session returns the same attachment.",
+        request=None,
+        responses={
+            201: AttachmentSerializer,
+            409: OpenApiResponse(description="Not all bytes received yet"),
+            400: OpenApiResponse(description="Checksum mismatch; the upload is discarded"),
+        },
+        tags=["Attachments"],
+    )
+    def post(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, owner=request.user)
+        try:
+            attachment = complete(session)
+        except OffsetMismatch as exc:
+            return _offset_conflict(exc)
+        except ChecksumMismatch as exc:
+            raise ValidationError({"sha256": str(exc)})
+        data = AttachmentSerializer(attachment, context={"request": request}).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class AttachmentDownloadView(APIView):
+    """
+    GET /api/attachments/<id>/ with single-range support (Range / If-Range), for
+    media players and resumed downloads. Like avatars this is public: the random
+    UUID works as the link's secret, so <video>/<img> tags can load it.
+    """
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        summary="Download an attachment",
+        parameters=[
+            OpenApiParameter(name="Range", location=OpenApiParameter.HEADER, required=False, type=str,
+                             description='Single byte range, e.g. "bytes=0-1023"'),
+        ],
+        responses={
+            200: OpenApiResponse(description="File bytes"),
+            206: OpenApiResponse(description="Requested byte range"),
+            304: OpenApiResponse(description="Not modified (ETag)"),
+            416: OpenApiResponse(description="Range not satisfiable"),
+        },
+        tags=["Attachments"],
+    )
+    def get(self, request, pk):
+        attachment = get_object_or_404(Attachment.objects.select_related("file"), pk=pk)
+        stored = attachment.file
+        etag = f'"{stored.sha256}"'
+        headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "private, max-age=86400",
+        }
+        if request.headers.get("If-None-Match") == etag:
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        if_range = request.headers.get("If-Range")
+        try:
+            byte_range = parse_range(request.headers.get("Range"), stored.size) if if_range in (None, etag) else None
+        except UnsatisfiableRange:
+            headers["Content-Range"] = f"bytes */{stored.size}"
+            return HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+
+        f = open(stored_path(stored.sha256), "rb")
+        if byte_range is None:
+            response = FileResponse(f, content_type=stored.content_type, filename=attachment.filename)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                iter_file(f, start, end - start + 1), status=status.HTTP_206_PARTIAL_CONTENT,
+                content_type=stored.content_type,
+            )
+            response["Content-Length"] = str(end - start + 1)
+            response["Content-Range"] = f"bytes {start}-{end}/{stored.size}"
+        for name, value in headers.items():
+            response[name] = value
+        return response
@@ -0,0 +1,32 @@
+# messages/management/commands/archive_messages.py
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from messages.store import chat_storage_settings, period_of, shift_period, store
+
+
+class Command(BaseCommand):
+    help = "Move months of messages older than --keep-months into compressed read-only archive files (run from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-months", type=int, default=None,
+                            help="Months kept live, including the current one (default: CHAT_STORAGE['KEEP_MONTHS'])")
+        parser.add_argument("--dry-run", action="store_true", help="Only list the months that would be archived")
+
+    def handle(self, *args, **options):
+        keep = options["keep_months"]
+        if keep is None:
+            keep = chat_storage_settings()["KEEP_MONTHS"]
+        if keep < 1:
+            raise CommandError("--keep-months must be at least 1.")
+        cutoff = shift_period(period_of(timezone.now()), -keep)
+        due = [p for p in store.live_periods() if p <= cutoff]
+        if not due:
+            self.stdout.write("Nothing to archive.")
+            return
+        for period in due:
+            if options["dry_run"]:
+                self.stdout.write(f"would archive {period}")
+                continue
+            copied = store.archive_period(period)
+            self.stdout.write(self.style.SUCCESS(f"Archived {period}: {copied} message(s)."))
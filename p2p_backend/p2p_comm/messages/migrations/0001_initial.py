@@ -0,0 +1,68 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:45
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_partitioned_table(apps, schema_editor):
+    # SQLite gets one plain table per month on first write (messages/store.py)
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    users = schema_editor.quote_name(
+        apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+    )
+    schema_editor.execute(f"""
+        CREATE TABLE chat_message (
+            id bigint GENERATED BY DEFAULT AS IDENTITY,
+            conversation varchar(64) NOT NULL,
+            sender_id bigint NOT NULL REFERENCES {users} (id) ON DELETE CASCADE,
+            recipient_id bigint NOT NULL REFERENCES {users} (id) ON DELETE CASCADE,
+            body text NOT NULL,
+            created_at timestamp with time zone NOT NULL,
+            PRIMARY KEY (created_at, id)
+        ) PARTITION BY RANGE (created_at)
+        """)
+    schema_editor.execute(
+        "CREATE INDEX chat_message_conv_idx ON chat_message (conversation, created_at, id)"
+    )
+
+
+def drop_partitioned_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS chat_message CASCADE")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("users", "0009_profile_view_rollups"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Message",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("conversation", models.CharField(max_length=64)),
+                ("body", models.TextField()),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "db_table": "chat_message",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(create_partitioned_table, drop_partitioned_table),
+    ]
@@ -1,3 +1,34 @@
+# messages/models.py
 from django.db import models
+from django.conf import settings
+from django.utils import timezone
 
-# Create your models here.
+
+class Message(models.Model):
+    """
+    A direct message between two users.
+
+    Rows are stored month by month (see messages/store.py): on Postgres this is a
+    table range-partitioned on created_at, created by migration 0001; on SQLite each
+    month is its own chat_message_YYYYMM table. Old months are moved to read-only
+    archive files by `manage.py archive_messages`. Django doesn't manage the table,
+    so read and write through `messages.store.store`, not the ORM.
+    """
+    # "<lower user id>:<higher user id>", so both directions share one index range
+    conversation = models.CharField(max_length=64)
+    # the database cascades deletes (ON DELETE CASCADE); the ORM must not touch this table
+    sender = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    body = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        managed = False
+        db_table = "chat_message"
+
+    def __str__(self):
+        return f"Message<{self.sender_id} -> {self.recipient_id} @ {self.created_at:%Y-%m-%d %H:%M}>"
@@ -0,0 +1,20 @@
+# messages/serializers.py
+from rest_framework import serializers
+
+MAX_MESSAGE_LENGTH = 5000
+
+
+class SendMessageSerializer(serializers.Serializer):
+    body = serializers.CharField(max_length=MAX_MESSAGE_LENGTH, trim_whitespace=False)
+
+    def validate_body(self, value):
+        if not value.strip():
+            raise serializers.ValidationError("Message can't be blank.")
+        return value
+
+
+class MessageSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    sender = serializers.CharField()
+    body = serializers.CharField()
+    created_at = serializers.DateTimeField()
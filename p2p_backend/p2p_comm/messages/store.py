@@ -0,0 +1,385 @@
+# messages/store.py
+"""
+Month-partitioned message storage with a cold archive.
+
+Messages are written to one partition per calendar month (UTC):
+  - Postgres: `chat_message` is range-partitioned on created_at (migration 0001)
+    and a `chat_message_YYYYMM` partition is attached on first write. History
+    queries go through the parent with month bounds, so the planner prunes to a
+    single partition.
+  - SQLite: each month is its own `chat_message_YYYYMM` table. Its AUTOINCREMENT
+    sequence starts at YYYYMM * 10**10, so ids stay unique across months.
+
+`manage.py archive_messages` moves months older than KEEP_MONTHS into read-only
+SQLite files (one per month, bodies zlib-compressed when that saves space) and
+drops the live partition. History pages newest-first by (created_at, id) across
+live and archived months alike, so clients never see the difference.
+
+The lists of live and archived months are cached per process for PERIODS_TTL
+seconds. They are re-read sooner when this process creates or archives a month,
+or when the archive directory changes, since archive_messages swaps the file in
+before dropping the partition. The current month is always treated as live.
+"""
+import base64
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+DEFAULTS = {
+    "ARCHIVE_DIR": None,   # defaults to BASE_DIR / "archive" / "messages"
+    "KEEP_MONTHS": 6,      # months (including the current one) kept live by archive_messages
+    "PERIODS_TTL": 60,     # seconds the live/archived month lists are cached per process
+}
+
+TABLE = "chat_message"
+PARTITION_RE = re.compile(r"^chat_message_(\d{6})$")
+ARCHIVE_RE = re.compile(r"^chat_message_(\d{6})\.sqlite3$")
+ARCHIVE_BATCH = 2000  # rows per fetch/insert while archiving
+COLUMNS = "id, conversation, sender_id, recipient_id, body, created_at"
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS message (
+    id INTEGER PRIMARY KEY,
+    conversation TEXT NOT NULL,
+    sender_id INTEGER NOT NULL,
+    recipient_id INTEGER NOT NULL,
+    body NOT NULL,            -- TEXT, or a zlib-compressed BLOB
+    created_at TEXT NOT NULL  -- UTC, fixed width, so text order is time order
+);
+CREATE INDEX IF NOT EXISTS message_conv_idx ON message (conversation, created_at, id);
+"""
+
+
+def chat_storage_settings():
+    conf = {**DEFAULTS, **getattr(settings, "CHAT_STORAGE", {})}
+    if conf["ARCHIVE_DIR"] is None:
+        conf["ARCHIVE_DIR"] = Path(settings.BASE_DIR) / "archive" / "messages"
+    return conf
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# -- periods ----------------------------------------------------------------
+
+def period_of(dt):
+    dt = dt.astimezone(dt_timezone.utc)
+    return f"{dt.year:04d}{dt.month:02d}"
+
+
+def shift_period(period, months):
+    index = int(period[:4]) * 12 + int(period[4:]) - 1 + months
+    return f"{index // 12:04d}{index % 12 + 1:02d}"
+
+
+def period_bounds(period):
+    """[start, end) of a month as aware UTC datetimes."""
+    nxt = shift_period(period, 1)
+    start = datetime(int(period[:4]), int(period[4:]), 1, tzinfo=dt_timezone.utc)
+    end = datetime(int(nxt[:4]), int(nxt[4:]), 1, tzinfo=dt_timezone.utc)
+    return start, end
+
+
+def conversation_key(user_id, other_id):
+    low, high = sorted((int(user_id), int(other_id)))
+    return f"{low}:{high}"
+
+
+# -- cursors ----------------------------------------------------------------
+
+def encode_cursor(created_at, message_id):
+    raw = f"{created_at.isoformat()}|{message_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, message_id = raw.split("|")
+        created_at = parse_datetime(ts)
+        if created_at is None or timezone.is_naive(created_at):
+            raise ValueError(ts)
+        return created_at, int(message_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(str(exc))
+
+
+# -- row encoding -----------------------------------------------------------
+
+def _to_datetime(value):
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if timezone.is_naive(value):
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return value
+
+
+def _archive_ts(dt):
+    return dt.astimezone(dt_timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _pack(body):
+    raw = body.encode()
+    packed = zlib.compress(raw, 9)
+    # short chat lines usually grow when compressed; keep those as plain text
+    return packed if len(packed) < len(raw) else body
+
+
+def _unpack(body):
+    return zlib.decompress(body).decode() if isinstance(body, bytes) else body
+
+
+def _row(row):
+    pk, sender_id, recipient_id, body, created_at = row
+    return {
+        "id": pk,
+        "sender_id": sender_id,
+        "recipient_id": recipient_id,
+        "body": _unpack(body),
+        "created_at": _to_datetime(created_at),
+    }
+
+
+class MessageStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._known = set()    # live periods this process has already created
+            self._periods = None   # (expires, archive dir version, live set, archived set)
+
+    # -- partitions ---------------------------------------------------------
+
+    def _partition(self, period):
+        return f"{TABLE}_{period}"
+
+    def _ddl(self, period):
+        qn = connection.ops.quote_name
+        table = qn(self._partition(period))
+        if connection.vendor == "postgresql":
+            start, end = period_bounds(period)
+            return [
+                f"CREATE TABLE IF NOT EXISTS {table} PARTITION OF {qn(TABLE)} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ]
+        users = qn(get_user_model()._meta.db_table)
+        return [
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            f'"id" integer NOT NULL PRIMARY KEY AUTOINCREMENT, '
+            f'"conversation" varchar(64) NOT NULL, '
+            f'"sender_id" bigint NOT NULL REFERENCES {users} ("id") ON DELETE CASCADE, '
+            f'"recipient_id" bigint NOT NULL REFERENCES {users} ("id") ON DELETE CASCADE, '
+            f'"body" text NOT NULL, '
+            f'"created_at" datetime NOT NULL)',
+            f"CREATE INDEX IF NOT EXISTS {qn(self._partition(period) + '_conv_idx')} "
+            f'ON {table} ("conversation", "created_at", "id")',
+            f"INSERT INTO sqlite_sequence (name, seq) SELECT '{self._partition(period)}', {int(period) * 10**10} "
+            f"WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = '{self._partition(period)}')",
+        ]
+
+    def ensure_period(self, period):
+        if period in self._known:
+            return
+        with connection.cursor() as cursor:
+            for statement in self._ddl(period):
+                cursor.execute(statement)
+        with self._lock:
+            self._known.add(period)
+            self._periods = None
+
+    def live_periods(self):
+        periods = []
+        for name in connection.introspection.table_names():
+            match = PARTITION_RE.match(name)
+            if match:
+                periods.append(match.group(1))
+        return sorted(periods)
+
+    def archived_periods(self):
+        archive_dir = Path(chat_storage_settings()["ARCHIVE_DIR"])
+        if not archive_dir.is_dir():
+            return []
+        return sorted(m.group(1) for m in map(ARCHIVE_RE.match, os.listdir(archive_dir)) if m)
+
+    def _archive_version(self):
+        try:
+            return os.stat(chat_storage_settings()["ARCHIVE_DIR"]).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _period_lists(self):
+        """(live, archived) sets of periods without introspecting the schema on every call."""
+        version = self._archive_version()
+        now = time.monotonic()
+        cached = self._periods
+        if cached is not None and cached[0] > now and cached[1] == version:
+            return cached[2], cached[3]
+        live, archived = set(self.live_periods()), set(self.archived_periods())
+        with self._lock:
+            self._periods = (now + chat_storage_settings()["PERIODS_TTL"], version, live, archived)
+        return live, archived
+
+    def _archive_path(self, period):
+        return Path(chat_storage_settings()["ARCHIVE_DIR"]) / f"{TABLE}_{period}.sqlite3"
+
+    # -- writes -------------------------------------------------------------
+
+    def append(self, sender_id, recipient_id, body, created_at=None):
+        created_at = created_at or timezone.now()
+        period = period_of(created_at)
+        self.ensure_period(period)
+        # on Postgres the parent routes the row; SQLite writes the month's table directly
+        table = TABLE if connection.vendor == "postgresql" else self._partition(period)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {connection.ops.quote_name(table)} "
+                "(conversation, sender_id, recipient_id, body, created_at) "
+                "VALUES (%s, %s, %s, %s, %s) RETURNING id",
+                [
+                    conversation_key(sender_id, recipient_id), sender_id, recipient_id, body,
+                    connection.ops.adapt_datetimefield_value(created_at),
+                ],
+            )
+            pk = cursor.fetchone()[0]
+        return {"id": pk, "sender_id": sender_id, "recipient_id": recipient_id, "body": body, "created_at": created_at}
+
+    # -- reads --------------------------------------------------------------
+
+    def _live_history(self, period, conversation, before, limit):
+        start, end = period_bounds(period)
+        adapt = connection.ops.adapt_datetimefield_value
+        table = TABLE if connection.vendor == "postgresql" else self._partition(period)
+        sql = (
+            f"SELECT id, sender_id, recipient_id, body, created_at FROM {connection.ops.quote_name(table)} "
+            "WHERE conversation = %s AND created_at >= %s AND created_at < %s"
+        )
+        params = [conversation, adapt(start), adapt(end)]
+        if before:
+            sql += " AND (created_at, id) < (%s, %s)"
+            params += [adapt(before[0]), before[1]]
+        sql += " ORDER BY created_at DESC, id DESC LIMIT %s"
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            return [_row(r) for r in cursor.fetchall()]
+
+    def _archive_history(self, period, conversation, before, limit):
+        sql = "SELECT id, sender_id, recipient_id, body, created_at FROM message WHERE conversation = ?"
+        params = [conversation]
+        if before:
+            sql += " AND (created_at, id) < (?, ?)"
+            params += [_archive_ts(before[0]), before[1]]
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        # archives are never modified in place (archive_period swaps in a new file)
+        db = sqlite3.connect(f"file:{self._archive_path(period)}?mode=ro&immutable=1", uri=True)
+        try:
+            return [_row(r) for r in db.execute(sql, params + [limit])]
+        finally:
+            db.close()
+
+    def history(self, user_id, other_id, before=None, limit=50):
+        """
+        Messages between two users, newest first. `before` is the (created_at, id)
+        of the oldest message already shown. Returns (messages, has_more).
+        """
+        # another process may have opened this month since the lists were cached
+        current = period_of(timezone.now())
+        self.ensure_period(current)
+        try:
+            return self._history(conversation_key(user_id, other_id), before, limit, current)
+        except DatabaseError:
+            if connection.vendor == "postgresql":  # queries go through the parent; nothing can go missing
+                raise
+            # SQLite: a month archived by another process between the version check and the query
+            with self._lock:
+                self._periods = None
+            return self._history(conversation_key(user_id, other_id), before, limit, current)
+
+    def _history(self, conversation, before, limit, current):
+        live, archived = self._period_lists()
+        live = live | {current}
+        periods = sorted(live | archived, reverse=True)
+        if before:
+            periods = [p for p in periods if p <= period_of(before[0])]
+
+        rows = []
+        for period in periods:
+            need = limit + 1 - len(rows)
+            found = []
+            if period in live:
+                found += self._live_history(period, conversation, before, need)
+            if period in archived:
+                found += self._archive_history(period, conversation, before, need)
+            if period in live and period in archived:
+                # only while archive_messages is between writing the file and dropping the partition
+                found = sorted({r["id"]: r for r in found}.values(), key=lambda r: (r["created_at"], r["id"]), reverse=True)
+            rows += found[:need]
+            if len(rows) > limit:
+                break
+        return rows[:limit], len(rows) > limit
+
+    # -- archiving ----------------------------------------------------------
+
+    def archive_period(self, period):
+        """
+        Copy a month into its read-only archive file, then drop the live partition.
+        Safe to re-run: rows are merged by id into an existing archive.
+        """
+        final = self._archive_path(period)
+        final.parent.mkdir(parents=True, exist_ok=True)
+        tmp = final.with_suffix(".tmp")
+        tmp.unlink(missing_ok=True)
+        if final.exists():
+            shutil.copyfile(final, tmp)
+
+        start, end = period_bounds(period)
+        adapt = connection.ops.adapt_datetimefield_value
+        copied = 0
+        db = sqlite3.connect(tmp)
+        try:
+            db.executescript(ARCHIVE_SCHEMA)
+            with connection.chunked_cursor() as cursor:
+                cursor.execute(
+                    f"SELECT {COLUMNS} FROM {connection.ops.quote_name(self._partition(period))} "
+                    "WHERE created_at >= %s AND created_at < %s",
+                    [adapt(start), adapt(end)],
+                )
+                while batch := cursor.fetchmany(ARCHIVE_BATCH):
+                    db.executemany(
+                        "INSERT OR IGNORE INTO message VALUES (?, ?, ?, ?, ?, ?)",
+                        [
+                            (pk, conv, sender, recipient, _pack(body), _archive_ts(_to_datetime(ts)))
+                            for pk, conv, sender, recipient, body, ts in batch
+                        ],
+                    )
+                    copied += len(batch)
+            db.commit()
+            db.execute("VACUUM")
+        finally:
+            db.close()
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, final)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {connection.ops.quote_name(self._partition(period))}")
+        with self._lock:
+            self._known.discard(period)
+            self._periods = None
+        return copied
+
+
+store = MessageStore()
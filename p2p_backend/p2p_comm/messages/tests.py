@@ -1,3 +1,124 @@
-from django.test import TestCase
+import io
+import os
+import sqlite3
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from notifications.models import Notification, NotificationState
+from users.testutils import make_user
+from .store import period_bounds, period_of, shift_period, store
+
+
+@override_settings(NOTIFICATIONS={"ASYNC": False})
+class MessageStoreTests(APITestCase):
+    def setUp(self):
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        overrides = override_settings(CHAT_STORAGE={"ARCHIVE_DIR": archive_dir.name, "KEEP_MONTHS": 2})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.archive_dir = archive_dir.name
+        store.reset()
+        self.addCleanup(store.reset)
+
+        self.alice, self.bob = make_user("alice"), make_user("bob")
+        self.current = period_of(timezone.now())
+        # two messages in each of the last four months, oldest first
+        self.sent = []
+        for months_ago in (3, 2, 1, 0):
+            start, _ = period_bounds(shift_period(self.current, -months_ago))
+            for i in range(2):
+                when = start + timedelta(hours=1, minutes=i)
+                sender, recipient = (self.alice, self.bob) if i == 0 else (self.bob, self.alice)
+                self.sent.append(store.append(sender.pk, recipient.pk, f"m{months_ago}.{i} " * (1 + 40 * i), when))
+        store.append(self.alice.pk, make_user("carol").pk, "not in this conversation")
+
+    def page_through(self, limit):
+        bodies, cursor = [], None
+        while True:
+            params = {"limit": limit, **({"before": cursor} if cursor else {})}
+            data = self.client.get("/api/messages/bob/", params).json()
+            bodies += [m["body"] for m in data["messages"]]
+            cursor = data["next"]
+            if not cursor:
+                return bodies
+
+    def test_history_pages_across_months(self):
+        self.client.force_authenticate(self.alice)
+        expected = [m["body"] for m in reversed(self.sent)]
+        self.assertEqual(len(store.live_periods()), 4)
+        self.assertEqual(self.page_through(3), expected)
+        self.assertGreater(self.sent[2]["id"], self.sent[1]["id"])  # ids stay ordered across month tables
+
+        self.assertEqual(self.client.get("/api/messages/bob/", {"before": "bogus"}).status_code, 400)
+
+    def test_archive_is_transparent(self):
+        self.client.force_authenticate(self.alice)
+        expected = self.page_through(3)
+        out = io.StringIO()
+        call_command("archive_messages", stdout=out)
+        oldest = shift_period(self.current, -3)
+        self.assertIn(f"Archived {oldest}: 2 message(s).", out.getvalue())
+
+        archived = store.archived_periods()
+        self.assertEqual(len(archived), 2)
+        self.assertEqual(len(store.live_periods()), 2)
+        self.assertEqual(self.page_through(3), expected)
+        self.assertEqual(self.page_through(100), expected)
+
+        path = os.path.join(self.archive_dir, f"chat_message_{oldest}.sqlite3")
+        self.assertFalse(os.stat(path).st_mode & 0o222)  # read-only
+        db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        kinds = dict(db.execute("SELECT id, typeof(body) FROM message"))
+        db.close()
+        # the long body was compressed, the short one kept as text
+        self.assertEqual(sorted(kinds.values()), ["blob", "text"])
+
+        call_command("archive_messages", stdout=io.StringIO())
+        self.assertEqual(store.archived_periods(), archived)
+
+    def test_period_lists_cached_until_archive(self):
+        self.client.force_authenticate(self.alice)
+        self.page_through(100)
+        with mock.patch.object(store, "live_periods", wraps=store.live_periods) as introspect:
+            self.page_through(100)
+            introspect.assert_not_called()
+            # archived by "another process": this one keeps its stale lists, but the archive
+            # directory changed, so they're re-read instead of querying the dropped table
+            stale = store._periods
+            store.archive_period(shift_period(self.current, -3))
+            store._periods = stale
+            self.assertEqual(len(self.page_through(100)), len(self.sent))
+            introspect.assert_called()
+
+        with self.assertRaises(CommandError):
+            call_command("archive_messages", "--keep-months", "0", stdout=io.StringIO())
+
+    def test_send(self):
+        self.client.force_authenticate(self.bob)
+        resp = self.client.post("/api/messages/alice/", {"body": "hello"}, format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.json()["sender"], "bob")
+        messages, _ = store.history(self.alice.pk, self.bob.pk, limit=1)
+        self.assertEqual(messages[0]["body"], "hello")
+        self.assertTrue(Notification.objects.filter(recipient=self.alice, kind="message", data__from="bob").exists())
+
+        self.assertEqual(self.client.post("/api/messages/bob/", {"body": "me"}, format="json").status_code, 400)
+        self.assertEqual(self.client.post("/api/messages/alice/", {"body": "  "}, format="json").status_code, 400)
+        self.assertEqual(self.client.get("/api/messages/nobody/").status_code, 404)
+        self.assertEqual(shift_period("202601", -1), "202512")
+
+    def test_send_survives_smtp_failure(self):
+        NotificationState.objects.create(user=self.alice, email_mode=NotificationState.EMAIL_IMMEDIATE)
+        self.client.force_authenticate(self.bob)
+        smtp_down = mock.patch("notifications.fanout.send_messages", side_effect=OSError("connection refused"))
+        with smtp_down, self.assertLogs("notifications.fanout", "ERROR"), self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post("/api/messages/alice/", {"body": "hello"}, format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertTrue(Notification.objects.filter(recipient=self.alice, emailed_at__isnull=True).exists())
@@ -0,0 +1,7 @@
+# messages/urls.py
+from django.urls import path
+from .views import ConversationView
+
+urlpatterns = [
+    path("<str:username>/", ConversationView.as_view(), name="conversation"),
+]
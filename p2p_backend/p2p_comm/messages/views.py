@@ -1,3 +1,87 @@
-from django.shortcuts import render
+# messages/views.py
+from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from notifications.fanout import notify
+from notifications.models import Notification
+from .serializers import MessageSerializer, SendMessageSerializer
+from .store import decode_cursor, encode_cursor, store
+
+User = get_user_model()
+
+
+def _serialize(message, usernames):
+    return {
+        "id": message["id"],
+        "sender": usernames[message["sender_id"]],
+        "body": message["body"],
+        "created_at": message["created_at"],
+    }
+
+
+class ConversationView(APIView):
+    """
+    GET  /api/messages/<username>/?before=<cursor>&limit=<n>  history, newest first
+    POST /api/messages/<username>/                           send {"body": "..."}
+    """
+    permission_classes = [IsAuthenticated]
+
+    def _other(self, request, username):
+        other = get_object_or_404(User.objects.only("id", "username"), username=username, is_active=True)
+        if other.pk == request.user.pk:
+            raise ValidationError({"detail": "You can't message yourself."})
+        return other
+
+    @extend_schema(
+        summary="Conversation history with a user",
+        description="Pages newest-first through live and archived months alike; pass `next` back as `before`.",
+        parameters=[
+            OpenApiParameter(name="before", description="Cursor from a previous page's `next`", required=False, type=str),
+            OpenApiParameter(name="limit", description="Page size (default 50, max 200)", required=False, type=int),
+        ],
+        responses={
+            200: OpenApiResponse(description='{"messages": [{id, sender, body, created_at}], "next": str | null}'),
+            400: OpenApiResponse(description="Invalid cursor"),
+        },
+        tags=["Messages"],
+    )
+    def get(self, request, username):
+        other = self._other(request, username)
+        try:
+            limit = min(max(int(request.query_params.get("limit", 50)), 1), 200)
+            before = request.query_params.get("before")
+            before = decode_cursor(before) if before else None
+        except ValueError:  # InvalidCursor or a non-integer limit
+            raise ValidationError({"before": "Invalid cursor or limit."})
+
+        messages, has_more = store.history(request.user.pk, other.pk, before=before, limit=limit)
+        usernames = {request.user.pk: request.user.username, other.pk: other.username}
+        last = messages[-1] if messages else None
+        return Response({
+            "messages": [_serialize(m, usernames) for m in messages],
+            "next": encode_cursor(last["created_at"], last["id"]) if has_more else None,
+        })
+
+    @extend_schema(
+        summary="Send a message",
+        request=SendMessageSerializer,
+        responses={201: MessageSerializer, 400: OpenApiResponse(description="Validation error")},
+        tags=["Messages"],
+    )
+    def post(self, request, username):
+        other = self._other(request, username)
+        serializer = SendMessageSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        message = store.append(request.user.pk, other.pk, serializer.validated_data["body"])
+        notify(
+            [other.pk], Notification.KIND_MESSAGE, f"New message from {request.user.username}",
+            data={"from": request.user.username},
+        )
+        usernames = {request.user.pk: request.user.username}
+        return Response(_serialize(message, usernames), status=status.HTTP_201_CREATED)
@@ -0,0 +1,23 @@
+from django.contrib import admin
+from users.admin import EstimatedCountPaginator
+from .models import Announcement, Notification, NotificationState
+
+
+@admin.register(Announcement)
+class AnnouncementAdmin(admin.ModelAdmin):
+    list_display = ("id","title","audience","batch","status","recipients_count","created_at")
+    list_filter = ("audience", "status")
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("id","recipient","kind","title","created_at","read_at")
+    list_select_related = ("recipient",)
+    raw_id_fields = ("recipient", "announcement")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+@admin.register(NotificationState)
+class NotificationStateAdmin(admin.ModelAdmin):
+    list_display = ("user","unread_count","email_mode","last_digest_at")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
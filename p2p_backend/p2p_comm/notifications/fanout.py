@@ -0,0 +1,233 @@
+# notifications/fanout.py
+"""
+Notification fan-out and email delivery.
+
+- notify(): create notifications for any number of recipients with chunked
+  bulk_create and one counter upsert per chunk.
+- Announcements fan out on a background worker thread after the request's
+  transaction commits, so staff get a 202 immediately.
+- Emails are sent in batches over one reused SMTP connection; users in digest
+  mode get a single merged email from `manage.py send_notification_digests`.
+  Immediate emails go out after commit (on the worker thread when ASYNC), so a
+  slow or failing SMTP server never fails or stalls the request that notified.
+"""
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from users.utils import bulk_upsert_increment
+from .models import Announcement, Notification, NotificationState
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ASYNC": True,            # run announcement fan-out on the worker thread
+    "CHUNK_SIZE": 1000,       # recipients per bulk_create
+    "EMAIL_BATCH_SIZE": 100,  # messages per SMTP connection
+    "DIGEST_MAX_ITEMS": 20,   # items listed in one digest email
+}
+
+
+def notification_settings():
+    return {**DEFAULTS, **getattr(settings, "NOTIFICATIONS", {})}
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# -- creating notifications -------------------------------------------------
+
+def _create_chunk(recipient_ids, kind, title, body, data, announcement):
+    # one transaction per chunk keeps locks short on big audiences
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(
+            [
+                Notification(recipient_id=rid, kind=kind, title=title, body=body, data=data, announcement=announcement)
+                for rid in recipient_ids
+            ],
+            batch_size=len(recipient_ids),
+        )
+        bulk_upsert_increment(NotificationState, ("user",), "unread_count", [((rid,), 1) for rid in recipient_ids])
+    email_after_commit(created)
+
+
+def notify(recipient_ids, kind, title, body="", data=None):
+    """Notify users by id, e.g. notify([bob.pk], Notification.KIND_MESSAGE, "New message from alice")."""
+    count = 0
+    for chunk in chunked(recipient_ids, notification_settings()["CHUNK_SIZE"]):
+        _create_chunk(chunk, kind, title, body, data or {}, None)
+        count += len(chunk)
+    return count
+
+
+def audience_queryset(announcement):
+    User = get_user_model()
+    qs = User.objects.filter(is_active=True)
+    if announcement.audience == Announcement.AUDIENCE_BATCH:
+        qs = qs.filter(batch=announcement.batch)
+    elif announcement.audience == Announcement.AUDIENCE_CURRENT:
+        qs = qs.filter(is_current_student=True)
+    elif announcement.audience == Announcement.AUDIENCE_ALUMNI:
+        qs = qs.filter(is_current_student=False)
+    return qs
+
+
+def fanout_announcement(announcement_id):
+    announcement = Announcement.objects.get(pk=announcement_id)
+    Announcement.objects.filter(pk=announcement_id).update(status=Announcement.STATUS_SENDING)
+    size = notification_settings()["CHUNK_SIZE"]
+    ids = audience_queryset(announcement).order_by("id").values_list("id", flat=True).iterator(chunk_size=size)
+    count = 0
+    try:
+        for chunk in chunked(ids, size):
+            _create_chunk(chunk, Notification.KIND_ANNOUNCEMENT, announcement.title, announcement.body, {}, announcement)
+            count += len(chunk)
+    except Exception:
+        Announcement.objects.filter(pk=announcement_id).update(status=Announcement.STATUS_FAILED, recipients_count=count)
+        raise
+    Announcement.objects.filter(pk=announcement_id).update(status=Announcement.STATUS_DONE, recipients_count=count)
+    return count
+
+
+# -- background worker ------------------------------------------------------
+
+class FanoutWorker:
+    """Single daemon thread draining a queue of fan-out jobs."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="notification-fanout", daemon=True)
+                self._thread.start()
+        self._queue.put((func, args))
+
+    def _run(self):
+        while True:
+            func, args = self._queue.get()
+            try:
+                func(*args)
+            except Exception:
+                logger.exception("notification fan-out job failed")
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+    def join(self):
+        self._queue.join()
+
+
+worker = FanoutWorker()
+
+
+def email_after_commit(notifications):
+    if notification_settings()["ASYNC"]:
+        transaction.on_commit(lambda: worker.submit(send_immediate_emails, notifications))
+    else:
+        transaction.on_commit(lambda: _send_immediate_emails_logged(notifications))
+
+
+def _send_immediate_emails_logged(notifications):
+    try:
+        send_immediate_emails(notifications)
+    except Exception:
+        logger.exception("immediate notification email failed")
+
+
+def enqueue_announcement(announcement):
+    if notification_settings()["ASYNC"]:
+        # the worker uses its own connection: only start once the row is committed
+        transaction.on_commit(lambda: worker.submit(fanout_announcement, announcement.pk))
+    else:
+        fanout_announcement(announcement.pk)
+
+
+# -- email ------------------------------------------------------------------
+
+def send_messages(messages):
+    """Send EmailMessages in batches, each batch over a single SMTP connection."""
+    sent = 0
+    for batch in chunked(messages, notification_settings()["EMAIL_BATCH_SIZE"]):
+        with get_connection() as connection:
+            sent += connection.send_messages(batch) or 0
+    return sent
+
+
+def _email_address(user):
+    return user["secondary_email"] or user["email"]
+
+
+def send_immediate_emails(notifications):
+    """Email the recipients (among `notifications`) who chose immediate delivery."""
+    User = get_user_model()
+    users = {
+        u["id"]: u
+        for u in User.objects.filter(
+            pk__in=[n.recipient_id for n in notifications],
+            notification_state__email_mode=NotificationState.EMAIL_IMMEDIATE,
+        ).values("id", "email", "secondary_email")
+    }
+    due = [n for n in notifications if n.recipient_id in users]
+    if not due:
+        return 0
+    sent = send_messages([
+        EmailMessage(subject=n.title, body=n.body, to=[_email_address(users[n.recipient_id])]) for n in due
+    ])
+    Notification.objects.filter(pk__in=[n.pk for n in due]).update(emailed_at=timezone.now())
+    return sent
+
+
+def send_digests():
+    """
+    One email per digest-mode user merging every notification not yet emailed.
+    Returns the number of emails sent.
+    """
+    conf = notification_settings()
+    User = get_user_model()
+    now = timezone.now()
+    pending = (
+        Notification.objects.filter(emailed_at__isnull=True, read_at__isnull=True)
+        .exclude(recipient__notification_state__email_mode__in=[NotificationState.EMAIL_IMMEDIATE, NotificationState.EMAIL_OFF])
+        .filter(created_at__lte=now)
+    )
+    recipient_ids = list(pending.order_by().values_list("recipient_id", flat=True).distinct())
+    sent = 0
+    for chunk in chunked(recipient_ids, conf["EMAIL_BATCH_SIZE"]):
+        users = {u["id"]: u for u in User.objects.filter(pk__in=chunk).values("id", "email", "secondary_email")}
+        items = {}
+        for n in pending.filter(recipient_id__in=chunk).order_by("-id").values("recipient_id", "title"):
+            items.setdefault(n["recipient_id"], []).append(n["title"])
+
+        messages = []
+        for rid, titles in items.items():
+            shown = titles[:conf["DIGEST_MAX_ITEMS"]]
+            lines = [f"- {t}" for t in shown]
+            if len(titles) > len(shown):
+                lines.append(f"...and {len(titles) - len(shown)} more.")
+            messages.append(EmailMessage(
+                subject=f"You have {len(titles)} new notification(s) on P2PComm",
+                body="Hello,\n\nHere is what you missed:\n\n" + "\n".join(lines) + "\n",
+                to=[_email_address(users[rid])],
+            ))
+        sent += send_messages(messages)
+        pending.filter(recipient_id__in=chunk).update(emailed_at=now)
+        NotificationState.objects.filter(user_id__in=chunk).update(last_digest_at=now)
+    return sent
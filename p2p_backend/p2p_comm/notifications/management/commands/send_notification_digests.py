@@ -0,0 +1,12 @@
+# notifications/management/commands/send_notification_digests.py
+from django.core.management.base import BaseCommand
+
+from notifications.fanout import send_digests
+
+
+class Command(BaseCommand):
+    help = "Email each digest-mode user one message merging their pending notifications (run from cron)."
+
+    def handle(self, *args, **options):
+        sent = send_digests()
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} digest email(s)."))
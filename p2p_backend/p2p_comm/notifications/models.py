@@ -0,0 +1,91 @@
+# notifications/models.py
+from django.db import models
+from django.conf import settings
+
+
+class Announcement(models.Model):
+    """A staff message fanned out to every user in an audience (see notifications/fanout.py)."""
+    AUDIENCE_ALL = "all"
+    AUDIENCE_BATCH = "batch"
+    AUDIENCE_CURRENT = "current"
+    AUDIENCE_ALUMNI = "alumni"
+    AUDIENCE_CHOICES = [
+        (AUDIENCE_ALL, "Everyone"),
+        (AUDIENCE_BATCH, "One batch"),
+        (AUDIENCE_CURRENT, "Current students"),
+        (AUDIENCE_ALUMNI, "Alumni"),
+    ]
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"), (STATUS_SENDING, "Sending"),
+        (STATUS_DONE, "Done"), (STATUS_FAILED, "Failed"),
+    ]
+
+    sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name="+")
+    audience = models.CharField(max_length=10, choices=AUDIENCE_CHOICES)
+    batch = models.CharField(max_length=10, blank=True)  # when audience == "batch"
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    recipients_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Announcement<{self.title} -> {self.audience}>"
+
+
+class Notification(models.Model):
+    KIND_MESSAGE = "message"
+    KIND_CONNECTION_REQUEST = "connection_request"
+    KIND_MENTION = "mention"
+    KIND_ANNOUNCEMENT = "announcement"
+    KIND_CHOICES = [
+        (KIND_MESSAGE, "Message"),
+        (KIND_CONNECTION_REQUEST, "Connection request"),
+        (KIND_MENTION, "Mention"),
+        (KIND_ANNOUNCEMENT, "Announcement"),
+    ]
+
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    data = models.JSONField(default=dict, blank=True)  # e.g. {"from": "alice.x1y2"}
+    announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(blank=True, null=True)
+    emailed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # inbox pages: newest first per recipient
+            models.Index(fields=["recipient", "-id"], name="notification_inbox_idx"),
+            # digest queue: only rows still waiting for an email are indexed
+            models.Index(fields=["recipient"], condition=models.Q(emailed_at__isnull=True), name="notification_unemailed_idx"),
+        ]
+
+    def __str__(self):
+        return f"Notification<{self.kind} -> {self.recipient_id}>"
+
+
+class NotificationState(models.Model):
+    """
+    Per-user notification counters and email preference. unread_count is kept
+    up to date on every fan-out / mark-read, so reading it is a single-row lookup.
+    """
+    EMAIL_IMMEDIATE = "immediate"
+    EMAIL_DIGEST = "digest"
+    EMAIL_OFF = "off"
+    EMAIL_CHOICES = [(EMAIL_IMMEDIATE, "Immediately"), (EMAIL_DIGEST, "Digest"), (EMAIL_OFF, "Off")]
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="notification_state")
+    # db defaults too: counters are upserted with raw SQL
+    unread_count = models.PositiveIntegerField(default=0, db_default=0)
+    email_mode = models.CharField(max_length=10, choices=EMAIL_CHOICES, default=EMAIL_DIGEST, db_default=EMAIL_DIGEST)
+    last_digest_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"NotificationState<{self.user_id} unread={self.unread_count}>"
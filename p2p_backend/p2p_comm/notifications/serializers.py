@@ -0,0 +1,35 @@
+# notifications/serializers.py
+from rest_framework import serializers
+from .models import Announcement, Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ["id", "kind", "title", "body", "data", "created_at", "read_at"]
+
+
+class AnnouncementSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Announcement
+        fields = ["id", "audience", "batch", "title", "body", "status", "recipients_count", "created_at"]
+        read_only_fields = ["status", "recipients_count", "created_at"]
+
+    def validate(self, data):
+        if data.get("audience") == Announcement.AUDIENCE_BATCH and not data.get("batch"):
+            raise serializers.ValidationError({"batch": "Required when audience is 'batch'."})
+        return data
+
+
+class MarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=500)
+    all = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if not data.get("all") and not data.get("ids"):
+            raise serializers.ValidationError("Pass ids or all=true.")
+        return data
+
+
+class NotificationPreferenceSerializer(serializers.Serializer):
+    email_mode = serializers.ChoiceField(choices=["immediate", "digest", "off"])
@@ -0,0 +1,81 @@
+from django.core import mail
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from users.models import CustomUser
+from users.testutils import make_user
+from .fanout import notify, send_digests
+from .models import Announcement, Notification, NotificationState
+
+SYNC = {"ASYNC": False, "CHUNK_SIZE": 2, "EMAIL_BATCH_SIZE": 2, "DIGEST_MAX_ITEMS": 2}
+
+
+@override_settings(NOTIFICATIONS=SYNC)
+class AnnouncementFanoutTests(APITestCase):
+    def setUp(self):
+        self.staff = CustomUser.objects.create_superuser("staff", "staff@iiitbh.ac.in", "pw")
+        self.batch = [make_user(f"s{i}", batch="2022") for i in range(5)]
+        make_user("junior", batch="2025")
+
+    def test_batch_announcement(self):
+        NotificationState.objects.create(user=self.batch[0], email_mode=NotificationState.EMAIL_IMMEDIATE)
+        self.client.force_authenticate(self.staff)
+        with self.captureOnCommitCallbacks(execute=True):  # emails go out after commit
+            resp = self.client.post(
+                "/api/notifications/announcements/",
+                {"audience": "batch", "batch": "2022", "title": "Convocation", "body": "Friday 10am"},
+                format="json",
+            )
+        self.assertEqual(resp.status_code, 202)
+        announcement = Announcement.objects.get()
+        self.assertEqual((announcement.status, announcement.recipients_count), (Announcement.STATUS_DONE, 5))
+        self.assertEqual(Notification.objects.filter(kind="announcement").count(), 5)
+        self.assertFalse(Notification.objects.filter(recipient__username="junior").exists())
+        self.assertEqual(
+            set(NotificationState.objects.values_list("unread_count", flat=True)), {1}
+        )
+        # only the immediate-mode user was emailed right away
+        self.assertEqual([m.to for m in mail.outbox], [["s0@iiitbh.ac.in"]])
+
+    def test_batch_required(self):
+        self.client.force_authenticate(self.staff)
+        resp = self.client.post("/api/notifications/announcements/", {"audience": "batch", "title": "x"}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.client.force_authenticate(self.batch[0])
+        resp = self.client.post("/api/notifications/announcements/", {"audience": "all", "title": "x"}, format="json")
+        self.assertEqual(resp.status_code, 403)
+
+
+@override_settings(NOTIFICATIONS=SYNC)
+class InboxTests(APITestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.client.force_authenticate(self.alice)
+
+    def test_unread_counter_and_mark_read(self):
+        for i in range(3):
+            notify([self.alice.pk], Notification.KIND_MESSAGE, f"Message {i}")
+        self.assertEqual(self.client.get("/api/notifications/unread-count/").json(), {"unread": 3})
+
+        page = self.client.get("/api/notifications/", {"limit": 2}).json()
+        self.assertEqual([n["title"] for n in page], ["Message 2", "Message 1"])
+        older = self.client.get("/api/notifications/", {"before": page[-1]["id"]}).json()
+        self.assertEqual([n["title"] for n in older], ["Message 0"])
+
+        resp = self.client.post("/api/notifications/read/", {"ids": [page[0]["id"], page[0]["id"]]}, format="json")
+        self.assertEqual(resp.json(), {"marked": 1, "unread": 2})
+        resp = self.client.post("/api/notifications/read/", {"all": True}, format="json")
+        self.assertEqual(resp.json(), {"marked": 2, "unread": 0})
+
+    def test_digest_merges_into_one_email(self):
+        bob = make_user("bob", secondary_email="bob@example.com")
+        make_user("carol")
+        NotificationState.objects.create(user=CustomUser.objects.get(username="carol"), email_mode="off")
+        for i in range(3):
+            notify([self.alice.pk, bob.pk], Notification.KIND_MENTION, f"Mention {i}")
+        notify([CustomUser.objects.get(username="carol").pk], Notification.KIND_MENTION, "Hi carol")
+
+        self.assertEqual(send_digests(), 2)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["alice@iiitbh.ac.in", "bob@example.com"])
+        self.assertIn("...and 1 more.", mail.outbox[0].body)
+        self.assertEqual(send_digests(), 0)  # already emailed
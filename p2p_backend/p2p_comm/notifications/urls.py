@@ -0,0 +1,13 @@
+# notifications/urls.py
+from django.urls import path
+from .views import (
+    NotificationListView, UnreadCountView, MarkReadView, NotificationPreferenceView, AnnouncementCreateView,
+)
+
+urlpatterns = [
+    path("", NotificationListView.as_view(), name="notification-list"),
+    path("unread-count/", UnreadCountView.as_view(), name="notification-unread-count"),
+    path("read/", MarkReadView.as_view(), name="notification-mark-read"),
+    path("preferences/", NotificationPreferenceView.as_view(), name="notification-preferences"),
+    path("announcements/", AnnouncementCreateView.as_view(), name="announcement-create"),
+]
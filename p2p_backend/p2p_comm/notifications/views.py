@@ -0,0 +1,125 @@
+# notifications/views.py
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .fanout import enqueue_announcement
+from .models import Notification, NotificationState
+from .serializers import (
+    AnnouncementSerializer, MarkReadSerializer, NotificationPreferenceSerializer, NotificationSerializer,
+)
+
+
+class NotificationListView(APIView):
+    """
+    GET /api/notifications/?before=<id>&limit=<n>&unread=1
+    Newest first, keyset-paginated by id.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="List my notifications",
+        parameters=[
+            OpenApiParameter(name="before", description="Return notifications older than this id", required=False, type=int),
+            OpenApiParameter(name="limit", description="Page size (default 20, max 100)", required=False, type=int),
+            OpenApiParameter(name="unread", description="Only unread notifications when 1", required=False, type=bool),
+        ],
+        responses={200: NotificationSerializer(many=True)},
+        tags=["Notifications"],
+    )
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+            before = request.query_params.get("before")
+            before = int(before) if before else None
+        except ValueError:
+            raise ValidationError({"detail": "before and limit must be integers."})
+        qs = Notification.objects.filter(recipient=request.user)
+        if before:
+            qs = qs.filter(id__lt=before)
+        if request.query_params.get("unread") in ("1", "true"):
+            qs = qs.filter(read_at__isnull=True)
+        return Response(NotificationSerializer(qs.order_by("-id")[:limit], many=True).data)
+
+
+class UnreadCountView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Unread notification count",
+        description="Reads the per-user counter row; no COUNT(*) over notifications.",
+        responses={200: OpenApiResponse(description='{"unread": int}')},
+        tags=["Notifications"],
+    )
+    def get(self, request):
+        unread = NotificationState.objects.filter(user=request.user).values_list("unread_count", flat=True).first()
+        return Response({"unread": unread or 0})
+
+
+class MarkReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Mark notifications as read",
+        request=MarkReadSerializer,
+        responses={200: OpenApiResponse(description='{"marked": int, "unread": int}')},
+        tags=["Notifications"],
+    )
+    def post(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        qs = Notification.objects.filter(recipient=request.user, read_at__isnull=True)
+        if not serializer.validated_data["all"]:
+            qs = qs.filter(id__in=serializer.validated_data["ids"])
+        marked = qs.update(read_at=timezone.now())
+
+        state = NotificationState.objects.filter(user=request.user)
+        if serializer.validated_data["all"]:
+            state.update(unread_count=0)
+        elif marked:
+            state.update(unread_count=Greatest(F("unread_count") - marked, Value(0)))
+        unread = state.values_list("unread_count", flat=True).first()
+        return Response({"marked": marked, "unread": unread or 0})
+
+
+class NotificationPreferenceView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Set notification email delivery",
+        description="immediate: one email per notification; digest: merged periodic email; off: no email.",
+        request=NotificationPreferenceSerializer,
+        responses={200: NotificationPreferenceSerializer},
+        tags=["Notifications"],
+    )
+    def put(self, request):
+        serializer = NotificationPreferenceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        NotificationState.objects.update_or_create(
+            user=request.user, defaults={"email_mode": serializer.validated_data["email_mode"]}
+        )
+        return Response(serializer.data)
+
+
+class AnnouncementCreateView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        summary="Announce to a batch, alumni, current students or everyone (staff only)",
+        description="Fan-out to recipients happens in the background; poll the announcement status in admin.",
+        request=AnnouncementSerializer,
+        responses={202: AnnouncementSerializer, 400: OpenApiResponse(description="Validation error")},
+        tags=["Notifications"],
+    )
+    def post(self, request):
+        serializer = AnnouncementSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        announcement = serializer.save(sender=request.user)
+        enqueue_announcement(announcement)
+        return Response(AnnouncementSerializer(announcement).data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,84 @@
+# p2p_comm/schema.py
+"""
+Precomputed OpenAPI schema.
+
+Outside DEBUG the schema is generated once (at deploy time with
+`manage.py build_openapi_schema`, or lazily on the first request if no artifact
+exists), rendered once per format and served from memory with an ETag.
+In DEBUG the stock SpectacularAPIView is used, so schema edits show up on reload.
+"""
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+_lock = threading.Lock()
+_schema = None
+_rendered = {}  # renderer class -> (body, etag)
+
+
+def schema_artifact_path():
+    """Versioned artifact location, e.g. openapi/schema-1.0.0.json"""
+    return settings.OPENAPI_SCHEMA_DIR / f"schema-{spectacular_settings.VERSION}.json"
+
+
+def generate_schema():
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def write_schema_artifact(schema=None):
+    path = schema_artifact_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(schema or generate_schema(), indent=2, sort_keys=True))
+    return path
+
+
+def get_schema():
+    global _schema
+    if _schema is None:
+        with _lock:
+            if _schema is None:
+                path = schema_artifact_path()
+                _schema = json.loads(path.read_text()) if path.exists() else generate_schema()
+    return _schema
+
+
+def get_rendered_schema(renderer, renderer_context):
+    key = type(renderer)
+    cached = _rendered.get(key)
+    if cached is None:
+        body = renderer.render(get_schema(), renderer.media_type, renderer_context)
+        cached = _rendered[key] = (body, quote_etag(hashlib.sha256(body).hexdigest()[:32]))
+    return cached
+
+
+def clear_schema_cache():
+    global _schema
+    with _lock:
+        _schema = None
+        _rendered.clear()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        # hot reload in DEBUG; per-language / per-version schemas aren't cached
+        if settings.DEBUG or request.GET.get("lang") or request.GET.get("version"):
+            return super().get(request, *args, **kwargs)
+
+        body, etag = get_rendered_schema(request.accepted_renderer, self.get_renderer_context())
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            resp = HttpResponseNotModified()
+        else:
+            resp = HttpResponse(body, content_type=request.accepted_media_type)
+            resp["Content-Disposition"] = f'inline; filename="{self._get_filename(request, None)}"'
+        resp["ETag"] = etag
+        resp["Cache-Control"] = "public, max-age=0, must-revalidate"
+        return resp
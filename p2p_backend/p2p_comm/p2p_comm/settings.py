@@ -30,6 +30,10 @@ INSTALLED_APPS = [
 
     # your apps
     "users",  # make sure this app exists
+    "notifications",
+    "messages",  # app label "chat" (django.contrib.messages owns "messages")
+    "attachments",
+    "posts",
 ]
 
 MIDDLEWARE = [
@@ -122,16 +126,32 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Precomputed schema artifact (manage.py build_openapi_schema), served outside DEBUG
+OPENAPI_SCHEMA_DIR = BASE_DIR / "openapi"
+
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.RevocationAwareJWTAuthentication",
     ),
     # default permission: authenticated for API views unless overridden per-view
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # reverse proxies in front of the app; per-IP rate limits trust only that many X-Forwarded-For
+    # hops (0: REMOTE_ADDR only, since without a proxy the header is whatever the client sent)
+    "NUM_PROXIES": 0,
+    # orjson-backed JSON (falls back to the stdlib encoder if orjson isn't installed)
+    "DEFAULT_RENDERER_CLASSES": (
+        "users.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "users.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 REST_FRAMEWORK.update({
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -141,8 +161,71 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
     "BLACKLIST_AFTER_ROTATION": False,
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.RevocationAwareTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.RevocationAwareTokenRefreshSerializer",
     # add more config here if needed (algorithms, signing key, etc.)
 }
+# In-process revocation set (users/revocation.py), synced from the DB every SYNC_INTERVAL seconds
+TOKEN_REVOCATION = {
+    "SYNC_INTERVAL": 5,
+    "BLOOM_CAPACITY": 100_000,
+    "BLOOM_ERROR_RATE": 0.001,
+}
+# In-memory presence (users/presence.py); last_seen is written behind every PERSIST_INTERVAL seconds
+PRESENCE = {
+    "TTL": 60,
+    "COALESCE": 15,
+    "TYPING_TTL": 6,
+    "PERSIST_INTERVAL": 120,
+}
+# Profile view counters are buffered in process and flushed to rollup tables (users/analytics.py)
+PROFILE_VIEW_COUNTERS = {
+    "FLUSH_INTERVAL": 30,
+    "FLUSH_SIZE": 5000,
+}
+# Notification fan-out (notifications/fanout.py); digests go out via manage.py send_notification_digests
+NOTIFICATIONS = {
+    "ASYNC": True,
+    "CHUNK_SIZE": 1000,
+    "EMAIL_BATCH_SIZE": 100,
+    "DIGEST_MAX_ITEMS": 20,
+}
+# Month-partitioned chat storage (messages/store.py); months past KEEP_MONTHS move to ARCHIVE_DIR via manage.py archive_messages
+CHAT_STORAGE = {
+    "ARCHIVE_DIR": BASE_DIR / "archive" / "messages",
+    "KEEP_MONTHS": 6,
+    "PERIODS_TTL": 60,
+}
+# Resumable chunked uploads (attachments/uploads.py); stale sessions are cleared by manage.py purge_uploads
+ATTACHMENTS = {
+    "ROOT": BASE_DIR / "uploads",
+    "MAX_SIZE": 100 * 1024 * 1024,
+    "CHUNK_SIZE": 8 * 1024 * 1024,
+    "SESSION_TTL": 24 * 3600,
+}
+# Rate limits (users/ratelimit.py): per view scope, key ("ip", "user", "data:<field>") -> "count/period".
+# Counters live in the "ratelimit" cache, which every worker process must share.
+RATELIMITS = {
+    "ENABLED": True,
+    "CACHE": "ratelimit",
+    "SCOPES": {
+        "register": {"ip": "10/h", "data:college_email": "3/h"},
+        "login": {"ip": "30/m", "data:username": "10/m"},
+        "search": {"ip": "120/m", "user": "60/m"},
+    },
+}
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    # SQLite file shared by the processes on this host; use Redis when running on several hosts
+    "ratelimit": {"BACKEND": "users.cache.SQLiteCounterCache", "LOCATION": BASE_DIR / "ratelimit.sqlite3"},
+}
+# Tests get an in-memory "ratelimit" cache with rate limiting off (p2p_comm/test_runner.py)
+TEST_RUNNER = "p2p_comm.test_runner.TestRunner"
+# Sharded reaction/comment counters (posts/counters.py); fold shards with manage.py compact_post_counters
+POST_COUNTERS = {
+    "SHARDS": 16,
+    "CACHE_TTL": 5,
+}
 
 
 # -----------------------
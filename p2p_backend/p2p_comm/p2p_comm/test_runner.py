@@ -0,0 +1,52 @@
+# p2p_comm/test_runner.py
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Keeps the suite off the on-disk rate-limit counters: BASE_DIR/ratelimit.sqlite3
+    lives outside the test database, so limits would carry over between runs.
+    The "ratelimit" cache is in-memory and rate limiting is off unless a test
+    enables it (users.tests.RateLimitTests).
+
+    The write-behind buffers (profile views, presence last_seen) never flush on
+    their own timers either: a timed flush would run on the background thread
+    mid-test, and whatever is still buffered at exit would go to the real
+    database. Tests that exercise flushing set their own intervals.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._ratelimit_overrides = override_settings(
+            RATELIMITS={**getattr(settings, "RATELIMITS", {}), "ENABLED": False},
+            PROFILE_VIEW_COUNTERS={**getattr(settings, "PROFILE_VIEW_COUNTERS", {}), "FLUSH_INTERVAL": 10**9},
+            PRESENCE={**getattr(settings, "PRESENCE", {}), "PERSIST_INTERVAL": 10**9},
+            CACHES={
+                **settings.CACHES,
+                "ratelimit": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "ratelimit-tests"},
+            },
+        )
+        self._ratelimit_overrides.enable()
+
+    def setup_databases(self, **kwargs):
+        # the buffers were created at import time, scheduled with the real intervals
+        self._reset_write_behind()
+        return super().setup_databases(**kwargs)
+
+    def teardown_databases(self, old_config, **kwargs):
+        # drop what is buffered against the test database before atexit can flush it elsewhere
+        self._reset_write_behind()
+        super().teardown_databases(old_config, **kwargs)
+
+    def _reset_write_behind(self):
+        from users.analytics import profile_views
+        from users.presence import tracker
+
+        profile_views.reset()
+        tracker.reset()
+
+    def teardown_test_environment(self, **kwargs):
+        self._ratelimit_overrides.disable()
+        super().teardown_test_environment(**kwargs)
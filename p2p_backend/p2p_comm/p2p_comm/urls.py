@@ -17,15 +17,20 @@ Including another URLconf
 # p2p_comm/urls.py
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
+from .schema import CachedSpectacularAPIView
 from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("users.urls")),  # your API router
+    path("api/notifications/", include("notifications.urls")),
+    path("api/messages/", include("messages.urls")),
+    path("api/attachments/", include("attachments.urls")),
+    path("api/posts/", include("posts.urls")),
     # OpenAPI schema + UIs:
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/schema/", CachedSpectacularAPIView.as_view(), name="schema"),
     path("api/docs/swagger/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
     path("api/docs/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
 ]
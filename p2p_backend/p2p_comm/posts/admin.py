@@ -1,3 +1,28 @@
 from django.contrib import admin
+from users.admin import EstimatedCountPaginator
+from .models import Post, Reaction, Comment
 
-# Register your models here.
+
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+    list_display = ("id","author","created_at")
+    list_select_related = ("author",)
+    raw_id_fields = ("author",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+@admin.register(Reaction)
+class ReactionAdmin(admin.ModelAdmin):
+    list_display = ("id","post","user","kind","created_at")
+    list_select_related = ("user",)
+    raw_id_fields = ("post", "user")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ("id","post","author","created_at")
+    list_select_related = ("author",)
+    raw_id_fields = ("post", "author")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
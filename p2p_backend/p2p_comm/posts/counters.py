@@ -0,0 +1,132 @@
+# posts/counters.py
+"""
+Sharded reaction and comment counters.
+
+A like on a hot post would serialize on a single `likes = likes + 1` row, and
+COUNT(*) over reactions on every read is expensive. Instead each (post, kind)
+count is spread over up to SHARDS PostCounterShard rows: a write upserts +1/-1
+into one randomly chosen shard, so concurrent writers rarely touch the same row.
+Reads sum the shards of a page of posts in one grouped query and cache the totals
+for CACHE_TTL seconds, so counts may lag by that much. The Reaction row (unique
+on post, user, kind) stays the source of truth for "did I react".
+
+`manage.py compact_post_counters` folds shards back into shard 0 by subtracting
+the value it read, so increments landing during compaction are never lost.
+"""
+import random
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Case, F, Sum, Value, When
+
+from users.utils import bulk_upsert_increment
+from .models import Comment, PostCounterShard, Reaction
+
+DEFAULTS = {
+    "SHARDS": 16,      # sub-counters per (post, kind); changing it never loses counts
+    "CACHE_TTL": 5,    # seconds summed counts are cached
+}
+
+COMMENT = "comment"
+CACHE_PREFIX = "post-counts:"
+
+
+def counter_settings():
+    return {**DEFAULTS, **getattr(settings, "POST_COUNTERS", {})}
+
+
+def bump(post_id, kind, delta):
+    shard = random.randrange(counter_settings()["SHARDS"])
+    bulk_upsert_increment(PostCounterShard, ("post", "kind", "shard"), "count", [((post_id, kind, shard), delta)])
+
+
+def add_reaction(post_id, user_id, kind):
+    """True if the reaction was new."""
+    try:
+        with transaction.atomic():
+            Reaction.objects.create(post_id=post_id, user_id=user_id, kind=kind)
+            bump(post_id, kind, 1)
+    except IntegrityError:  # already reacted (or the post is gone)
+        return False
+    return True
+
+
+def remove_reaction(post_id, user_id, kind):
+    """True if there was a reaction to remove."""
+    with transaction.atomic():
+        deleted, _ = Reaction.objects.filter(post_id=post_id, user_id=user_id, kind=kind).delete()
+        if deleted:
+            bump(post_id, kind, -1)
+    return bool(deleted)
+
+
+def add_comment(post, author, body):
+    with transaction.atomic():
+        comment = Comment.objects.create(post=post, author=author, body=body)
+        bump(post.pk, COMMENT, 1)
+    return comment
+
+
+def post_counts(post_ids):
+    """{post_id: {kind: count}} for a page of posts; cached, so up to CACHE_TTL seconds stale."""
+    post_ids = list(post_ids)
+    cached = cache.get_many([f"{CACHE_PREFIX}{pk}" for pk in post_ids])
+    counts = {pk: cached[f"{CACHE_PREFIX}{pk}"] for pk in post_ids if f"{CACHE_PREFIX}{pk}" in cached}
+    missing = [pk for pk in post_ids if pk not in counts]
+    if missing:
+        fresh = {pk: {} for pk in missing}
+        rows = (
+            PostCounterShard.objects.filter(post_id__in=missing)
+            .values("post_id", "kind").annotate(total=Sum("count")).order_by()
+        )
+        for row in rows:
+            if row["total"]:
+                fresh[row["post_id"]][row["kind"]] = row["total"]
+        cache.set_many({f"{CACHE_PREFIX}{pk}": c for pk, c in fresh.items()}, counter_settings()["CACHE_TTL"])
+        counts.update(fresh)
+    return counts
+
+
+def my_reactions(post_ids, user_id):
+    mine = defaultdict(list)
+    for post_id, kind in Reaction.objects.filter(post_id__in=post_ids, user_id=user_id).values_list("post_id", "kind"):
+        mine[post_id].append(kind)
+    return mine
+
+
+def compact_counters(batch_size=1000):
+    """
+    Fold shards 1..N into shard 0 and delete the emptied rows. Each shard is
+    decremented by the value read rather than reset, so concurrent bumps survive.
+    Returns the number of shard rows folded.
+    """
+    folded = 0
+    last_id = 0
+    while True:
+        rows = list(
+            PostCounterShard.objects.filter(id__gt=last_id, shard__gt=0).order_by("id")
+            .values_list("id", "post_id", "kind", "count")[:batch_size]
+        )
+        if not rows:
+            return folded
+        last_id = rows[-1][0]
+        moved = [(pk, count) for pk, _, _, count in rows if count]
+        totals = Counter()
+        for _, post_id, kind, count in rows:
+            totals[post_id, kind] += count
+        with transaction.atomic():
+            if moved:
+                PostCounterShard.objects.filter(pk__in=[pk for pk, _ in moved]).update(
+                    count=F("count") - Case(
+                        *[When(pk=pk, then=Value(n)) for pk, n in moved], output_field=BigIntegerField()
+                    )
+                )
+                bulk_upsert_increment(
+                    PostCounterShard, ("post", "kind", "shard"), "count",
+                    [((post_id, kind, 0), n) for (post_id, kind), n in totals.items() if n],
+                )
+            # a shard bumped since we read it is non-zero again and stays
+            PostCounterShard.objects.filter(pk__in=[r[0] for r in rows], count=0).delete()
+        folded += len(rows)
@@ -0,0 +1,92 @@
+# posts/management/commands/bench_post_likes.py
+import os
+import tempfile
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.test.utils import override_settings
+
+from posts.counters import CACHE_PREFIX, add_reaction, post_counts
+from posts.models import Post
+
+USERNAME_PREFIX = "bench.likes."
+
+
+class Command(BaseCommand):
+    help = (
+        "Likes/sec on a single hot post from concurrent writers, for different shard counts "
+        "(1 shard = a single counter row). Runs against a throwaway database created from the migrations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--likes", type=int, default=2000, help="likes per run, one per bench user")
+        parser.add_argument("--shards", nargs="+", type=int, default=[1, 16])
+
+    def handle(self, *args, **options):
+        # bench users never touch the real database: deleting them afterwards would leave
+        # ProfileTombstones behind that every delta-sync client then downloads
+        old_name = connection.settings_dict["NAME"]
+        test_settings = connection.settings_dict["TEST"]
+        old_test_name = test_settings["NAME"]
+        with tempfile.TemporaryDirectory() as tmp:
+            if connection.vendor == "sqlite":
+                test_settings["NAME"] = os.path.join(tmp, "bench.sqlite3")  # a file: threads need their own connections
+            else:
+                test_settings["NAME"] = f"{old_name}_bench"
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                self.bench(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                test_settings["NAME"] = old_test_name
+
+    def bench(self, options):
+        User = get_user_model()
+        n, threads = options["likes"], options["threads"]
+        User.objects.bulk_create(
+            [User(username=f"{USERNAME_PREFIX}{i}", email=f"{USERNAME_PREFIX}{i}@bench.invalid", password="!")
+             for i in range(n)],
+            batch_size=1000, ignore_conflicts=True,
+        )
+        user_ids = list(User.objects.filter(username__startswith=USERNAME_PREFIX).values_list("id", flat=True)[:n])
+        self.stdout.write(f"backend: {connection.vendor}, {threads} threads, {len(user_ids)} likes per run")
+        for shards in options["shards"]:
+            self.run(shards, user_ids, threads)
+
+    def run(self, shards, user_ids, threads):
+        post = Post.objects.create(author_id=user_ids[0], body="benchmark")
+        retries = [0] * threads
+
+        def worker(index):
+            try:
+                for user_id in user_ids[index::threads]:
+                    while True:
+                        try:
+                            add_reaction(post.pk, user_id, "like")
+                            break
+                        except OperationalError:  # e.g. SQLite "database is locked"
+                            retries[index] += 1
+            finally:
+                connection.close()
+
+        with override_settings(POST_COUNTERS={"SHARDS": shards}):
+            pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+            start = time.perf_counter()
+            for t in pool:
+                t.start()
+            for t in pool:
+                t.join()
+            elapsed = time.perf_counter() - start
+
+        cache.delete(f"{CACHE_PREFIX}{post.pk}")
+        counted = post_counts([post.pk])[post.pk].get("like", 0)
+        self.stdout.write(
+            f"{shards:>3} shard(s): {len(user_ids) / elapsed:8.0f} likes/s | "
+            f"counted {counted}/{len(user_ids)} | {sum(retries)} lock retries"
+        )
+        post.delete()
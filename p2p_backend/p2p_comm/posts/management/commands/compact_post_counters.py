@@ -0,0 +1,15 @@
+# posts/management/commands/compact_post_counters.py
+from django.core.management.base import BaseCommand
+
+from posts.counters import compact_counters
+
+
+class Command(BaseCommand):
+    help = "Fold sharded post counters into one row per (post, kind) (run from cron; safe while writes continue)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        folded = compact_counters(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Folded {folded} counter shard(s)."))
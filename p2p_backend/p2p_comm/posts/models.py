@@ -1,3 +1,65 @@
+# posts/models.py
 from django.db import models
+from django.conf import settings
 
-# Create your models here.
+
+class Post(models.Model):
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="posts")
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Post<{self.pk} by {self.author_id}>"
+
+
+class Reaction(models.Model):
+    KIND_LIKE = "like"
+    KIND_CELEBRATE = "celebrate"
+    KIND_SUPPORT = "support"
+    KIND_INSIGHTFUL = "insightful"
+    KIND_FUNNY = "funny"
+    KIND_CHOICES = [
+        (KIND_LIKE, "Like"),
+        (KIND_CELEBRATE, "Celebrate"),
+        (KIND_SUPPORT, "Support"),
+        (KIND_INSIGHTFUL, "Insightful"),
+        (KIND_FUNNY, "Funny"),
+    ]
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="reactions")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["post", "user", "kind"], name="uniq_reaction_post_user_kind"),
+        ]
+
+
+class Comment(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["post", "id"], name="comment_post_id_idx")]
+
+
+class PostCounterShard(models.Model):
+    """
+    One of up to COUNTER_SHARDS sub-counters for a (post, kind); the count is
+    the sum over shards (see posts/counters.py). `kind` is a reaction kind or
+    "comment". Written only with raw upserts, hence db_default.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=12)
+    shard = models.PositiveSmallIntegerField()
+    count = models.BigIntegerField(default=0, db_default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["post", "kind", "shard"], name="uniq_post_counter_shard"),
+        ]
@@ -0,0 +1,34 @@
+# posts/serializers.py
+from rest_framework import serializers
+from .models import Comment, Post, Reaction
+
+
+class PostSerializer(serializers.ModelSerializer):
+    author = serializers.CharField(source="author.username", read_only=True)
+    counts = serializers.SerializerMethodField()
+    my_reactions = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Post
+        fields = ["id", "author", "body", "created_at", "counts", "my_reactions"]
+        read_only_fields = ["created_at"]
+
+    # counts and the caller's reactions are fetched once per page by the view
+    def get_counts(self, obj) -> dict:
+        return self.context.get("counts", {}).get(obj.pk, {})
+
+    def get_my_reactions(self, obj) -> list:
+        return self.context.get("mine", {}).get(obj.pk, [])
+
+
+class ReactionSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=Reaction.KIND_CHOICES)
+
+
+class CommentSerializer(serializers.ModelSerializer):
+    author = serializers.CharField(source="author.username", read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ["id", "author", "body", "created_at"]
+        read_only_fields = ["created_at"]
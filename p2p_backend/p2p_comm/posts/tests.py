@@ -1,3 +1,79 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from users.testutils import make_user
+from .counters import compact_counters, post_counts
+from .models import Post, PostCounterShard, Reaction
+
+
+@override_settings(POST_COUNTERS={"SHARDS": 4, "CACHE_TTL": 60})
+class PostReactionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.alice = make_user("alice")
+        self.post = Post.objects.create(author=self.alice, body="Placement season tips")
+        self.url = f"/api/posts/{self.post.pk}/"
+
+    def like_as(self, users, kind="like"):
+        for user in users:
+            self.client.force_authenticate(user)
+            self.client.post(self.url + "reactions/", {"kind": kind}, format="json")
+
+    def test_react_and_unreact(self):
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.post(self.url + "reactions/", {"kind": "like"}, format="json").status_code, 201)
+        self.assertEqual(self.client.post(self.url + "reactions/", {"kind": "like"}, format="json").status_code, 200)
+        self.assertEqual(self.client.post(self.url + "reactions/", {"kind": "funny"}, format="json").status_code, 201)
+        self.assertEqual(self.client.post(self.url + "reactions/", {"kind": "meh"}, format="json").status_code, 400)
+        self.assertEqual(self.client.post("/api/posts/999/reactions/", {"kind": "like"}, format="json").status_code, 404)
+        self.assertEqual(Reaction.objects.count(), 2)
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["counts"], {"like": 1, "funny": 1})
+        self.assertEqual(sorted(data["my_reactions"]), ["funny", "like"])
+
+        self.assertEqual(self.client.delete(self.url + "reactions/like/").status_code, 204)
+        self.assertEqual(self.client.delete(self.url + "reactions/like/").status_code, 404)
+        cache.clear()
+        self.assertEqual(self.client.get(self.url).json()["counts"], {"funny": 1})
+
+    def test_counts_are_sharded_and_cached(self):
+        users = [make_user(f"u{i}") for i in range(8)]
+        with mock.patch("posts.counters.random.randrange", side_effect=lambda n: len(Reaction.objects.all()) % n):
+            self.like_as(users)
+        self.assertEqual(PostCounterShard.objects.filter(post=self.post).count(), 4)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(post_counts([self.post.pk]), {self.post.pk: {"like": 8}})
+        with self.assertNumQueries(0):
+            post_counts([self.post.pk])
+
+        self.client.force_authenticate(users[0])
+        self.client.post(self.url + "comments/", {"body": "Thanks!"}, format="json")
+        cache.clear()
+        feed = self.client.get("/api/posts/").json()
+        self.assertEqual(feed[0]["counts"], {"like": 8, "comment": 1})
+
+    def test_compaction_keeps_totals(self):
+        users = [make_user(f"u{i}") for i in range(10)]
+        with mock.patch("posts.counters.random.randrange", side_effect=[0, 1, 2, 1, 2, 1, 2, 1, 2, 2]):
+            self.like_as(users)
+        # an unlike landing on a shard with no likes leaves it negative
+        with mock.patch("posts.counters.random.randrange", return_value=3):
+            self.client.delete(self.url + "reactions/like/")
+        shards = PostCounterShard.objects.filter(post=self.post, kind="like")
+        self.assertEqual(sorted(shards.values_list("shard", "count")), [(0, 1), (1, 4), (2, 5), (3, -1)])
+
+        call_command("compact_post_counters", stdout=mock.MagicMock())
+        self.assertEqual(list(shards.values_list("shard", "count")), [(0, 9)])
+
+        with mock.patch("posts.counters.random.randrange", return_value=2):
+            self.like_as([make_user("late")])
+        self.assertEqual(compact_counters(), 1)
+        self.assertEqual(shards.get().count, 10)
+        self.assertEqual(post_counts([self.post.pk])[self.post.pk], {"like": 10})
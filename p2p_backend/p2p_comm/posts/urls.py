@@ -0,0 +1,11 @@
+# posts/urls.py
+from django.urls import path
+from .views import PostListView, PostDetailView, ReactionView, ReactionDetailView, CommentListView
+
+urlpatterns = [
+    path("", PostListView.as_view(), name="post-list"),
+    path("<int:pk>/", PostDetailView.as_view(), name="post-detail"),
+    path("<int:pk>/reactions/", ReactionView.as_view(), name="post-react"),
+    path("<int:pk>/reactions/<str:kind>/", ReactionDetailView.as_view(), name="post-unreact"),
+    path("<int:pk>/comments/", CommentListView.as_view(), name="post-comments"),
+]
@@ -1,3 +1,148 @@
-from django.shortcuts import render
+# posts/views.py
+from django.shortcuts import get_object_or_404
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .counters import add_comment, add_reaction, my_reactions, post_counts, remove_reaction
+from .models import Comment, Post, Reaction
+from .serializers import CommentSerializer, PostSerializer, ReactionSerializer
+
+PAGE_PARAMETERS = [
+    OpenApiParameter(name="before", description="Return items older than this id", required=False, type=int),
+    OpenApiParameter(name="limit", description="Page size (default 20, max 100)", required=False, type=int),
+]
+
+
+def page_params(request):
+    try:
+        limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+        before = request.query_params.get("before")
+        return (int(before) if before else None), limit
+    except ValueError:
+        raise ValidationError({"detail": "before and limit must be integers."})
+
+
+def serialize_posts(posts, user):
+    ids = [p.pk for p in posts]
+    context = {"counts": post_counts(ids), "mine": my_reactions(ids, user.pk)}
+    return PostSerializer(posts, many=True, context=context).data
+
+
+class PostListView(APIView):
+    """
+    GET  /api/posts/?before=<id>&limit=<n>&author=<username>  newest first
+    POST /api/posts/
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="List posts",
+        description="Newest first, keyset-paginated by id. `counts` are summed from sharded counters and "
+                    "may lag by a few seconds.",
+        parameters=PAGE_PARAMETERS + [
+            OpenApiParameter(name="author", description="Only posts by this username", required=False, type=str),
+        ],
+        responses={200: PostSerializer(many=True)},
+        tags=["Posts"],
+    )
+    def get(self, request):
+        before, limit = page_params(request)
+        qs = Post.objects.select_related("author").only("id", "body", "created_at", "author__username")
+        if before:
+            qs = qs.filter(id__lt=before)
+        if request.query_params.get("author"):
+            qs = qs.filter(author__username=request.query_params["author"])
+        return Response(serialize_posts(list(qs.order_by("-id")[:limit]), request.user))
+
+    @extend_schema(
+        summary="Create a post",
+        request=PostSerializer,
+        responses={201: PostSerializer, 400: OpenApiResponse(description="Validation error")},
+        tags=["Posts"],
+    )
+    def post(self, request):
+        serializer = PostSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(author=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class PostDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(summary="Get a post", responses={200: PostSerializer}, tags=["Posts"])
+    def get(self, request, pk):
+        post = get_object_or_404(Post.objects.select_related("author"), pk=pk)
+        return Response(serialize_posts([post], request.user)[0])
+
+
+class ReactionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="React to a post",
+        description="Idempotent: reacting twice with the same kind is a no-op (200 instead of 201).",
+        request=ReactionSerializer,
+        responses={201: ReactionSerializer, 200: ReactionSerializer, 404: OpenApiResponse(description="No such post")},
+        tags=["Posts"],
+    )
+    def post(self, request, pk):
+        serializer = ReactionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        get_object_or_404(Post.objects.only("id"), pk=pk)
+        created = add_reaction(pk, request.user.pk, serializer.validated_data["kind"])
+        return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+class ReactionDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Remove my reaction",
+        responses={204: None, 404: OpenApiResponse(description="No such reaction")},
+        tags=["Posts"],
+    )
+    def delete(self, request, pk, kind):
+        if kind not in dict(Reaction.KIND_CHOICES) or not remove_reaction(pk, request.user.pk, kind):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CommentListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="List comments on a post",
+        description="Oldest first; pass the last id as `after` for the next page.",
+        parameters=[
+            OpenApiParameter(name="after", description="Return comments newer than this id", required=False, type=int),
+            OpenApiParameter(name="limit", description="Page size (default 20, max 100)", required=False, type=int),
+        ],
+        responses={200: CommentSerializer(many=True)},
+        tags=["Posts"],
+    )
+    def get(self, request, pk):
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+            after = int(request.query_params.get("after") or 0)
+        except ValueError:
+            raise ValidationError({"detail": "after and limit must be integers."})
+        qs = Comment.objects.filter(post_id=pk, id__gt=after).select_related("author").order_by("id")[:limit]
+        return Response(CommentSerializer(qs, many=True).data)
+
+    @extend_schema(
+        summary="Comment on a post",
+        request=CommentSerializer,
+        responses={201: CommentSerializer, 404: OpenApiResponse(description="No such post")},
+        tags=["Posts"],
+    )
+    def post(self, request, pk):
+        post = get_object_or_404(Post.objects.only("id"), pk=pk)
+        serializer = CommentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        comment = add_comment(post, request.user, serializer.validated_data["body"])
+        return Response(CommentSerializer(comment).data, status=status.HTTP_201_CREATED)
@@ -1,14 +1,83 @@
 # users/admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
 from .models import CustomUser, Profile
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for big changelists: on Postgres an unfiltered queryset is counted
+    from the planner's row estimate instead of COUNT(*). Filtered/searched
+    changelists, and other databases, get an exact count.
+    """
+    exact_below = 10_000  # small tables are cheap to count exactly
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if isinstance(qs, QuerySet) and not qs.query.where:
+            estimate = self.estimate(qs)
+            if estimate is not None and estimate >= self.exact_below:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def estimate(qs):
+        connection = connections[qs.db]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [qs.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0]
+        # no cheap estimate elsewhere: max(pk) overcounts after deletes and shows empty trailing pages
+        return None
+
+
+@admin.action(description="Mark selected users as alumni")
+def mark_as_alumni(modeladmin, request, queryset):
+    # one UPDATE, also when "select all N" is used on a filtered batch
+    updated = queryset.update(is_current_student=False)
+    modeladmin.message_user(request, f"{updated} user(s) marked as alumni.")
+
+
+@admin.action(description="Mark selected users as current students")
+def mark_as_current_students(modeladmin, request, queryset):
+    updated = queryset.update(is_current_student=True)
+    modeladmin.message_user(request, f"{updated} user(s) marked as current students.")
+
+
 @admin.register(CustomUser)
 class CustomUserAdmin(UserAdmin):
     list_display = ("id","full_name","username","email","secondary_email","batch","is_current_student","is_staff")
     fieldsets = UserAdmin.fieldsets + (("Extra", {"fields": ("full_name", "secondary_email", "batch", "is_current_student")}),)
+    list_filter = ("is_current_student", "is_staff", "batch")
+    # exact/prefix lookups only, so every search can use an index instead of LIKE '%q%'
+    search_fields = ("username__exact", "email__exact", "full_name__startswith")
+    ordering = ("-id",)
+    actions = [mark_as_alumni, mark_as_current_students]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
-    list_display = ("id","user","updated_at")
\ No newline at end of file
+    list_display = ("id","user","avatar_size","updated_at")
+    list_select_related = ("user",)
+    search_fields = ("user__username__exact",)
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    raw_id_fields = ("user",)
+    # large columns the changelist never shows
+    changelist_defer = ("avatar_blob", "about", "experiences", "links")
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name and match.url_name.endswith("_changelist"):
+            qs = qs.defer(*self.changelist_defer)
+        return qs
@@ -0,0 +1,153 @@
+# users/analytics.py
+"""
+Write-behind profile view counting.
+
+PublicProfileView calls `profile_views.record()`, which only bumps in-process counters
+keyed by (profile, viewer, hour). The buffer is flushed into the rollup tables
+(ProfileViewHourly, ProfileViewerRollup) with one upsert per table when it grows
+past FLUSH_SIZE keys or FLUSH_INTERVAL seconds have passed, so a popular profile
+costs one row update per hour per process instead of one write per view.
+The flush itself runs on the background flush thread (users/background.py),
+never on the request that noticed it was due.
+Counts are eventually consistent: stats lag by at most one flush interval.
+
+Rows for a profile or viewer deleted since the view are dropped at flush time;
+other database errors keep the batch for up to MAX_FLUSH_RETRIES more flushes.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils import timezone
+
+from django.db.models import Max, Sum
+from django.db.models.functions import TruncDate
+
+from .background import flusher
+from .fastpath import profile_card_rows, serialize_profile_card
+from .models import Profile, ProfileViewHourly, ProfileViewerRollup
+from .utils import bulk_upsert_increment
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "FLUSH_INTERVAL": 30,   # seconds
+    "FLUSH_SIZE": 5000,     # distinct (profile, viewer, hour) keys
+}
+
+MAX_FLUSH_RETRIES = 3  # consecutive failed flushes before a batch is dropped
+
+
+def view_counter_settings():
+    return {**DEFAULTS, **getattr(settings, "PROFILE_VIEW_COUNTERS", {})}
+
+
+class ProfileViewBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def _schedule(self):
+        conf = view_counter_settings()
+        self._flush_size = conf["FLUSH_SIZE"]
+        self._next_flush = time.monotonic() + conf["FLUSH_INTERVAL"]
+
+    def record(self, profile_id, viewer_id=None):
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        now = time.monotonic()
+        with self._lock:
+            self._counts[profile_id, viewer_id, hour] += 1
+            due = now >= self._next_flush or len(self._counts) >= self._flush_size
+        if due:
+            flusher.submit(self.flush)
+
+    def pending(self):
+        return sum(self._counts.values())
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._schedule()
+        if not counts:
+            return
+        try:
+            try:
+                self._write(counts)
+            except IntegrityError:
+                # a profile or viewer was deleted after being counted; retrying would fail forever
+                self._write(self._without_deleted(counts))
+        except DatabaseError:
+            with self._lock:
+                self._failures += 1
+                if self._failures > MAX_FLUSH_RETRIES:
+                    self._failures = 0
+                    logger.exception("profile view flush failed; dropping %d views", sum(counts.values()))
+                    return
+                self._counts.update(counts)  # transient (locked, disconnected): retry on the next flush
+            logger.warning("profile view flush failed; retrying on next flush", exc_info=True)
+            return
+        self._failures = 0
+
+    @staticmethod
+    def _write(counts):
+        hourly = Counter()
+        viewers = []
+        for (profile_id, viewer_id, hour), n in counts.items():
+            hourly[profile_id, hour] += n
+            if viewer_id is not None:
+                viewers.append(((profile_id, viewer_id, hour), n))
+        with transaction.atomic():
+            bulk_upsert_increment(ProfileViewHourly, ("profile", "hour"), "views", hourly.items())
+            bulk_upsert_increment(ProfileViewerRollup, ("profile", "viewer", "hour"), "views", viewers)
+
+    @staticmethod
+    def _without_deleted(counts):
+        profiles = set(Profile.objects.filter(pk__in={k[0] for k in counts}).values_list("pk", flat=True))
+        viewer_ids = {k[1] for k in counts if k[1] is not None}
+        viewers = set(get_user_model().objects.filter(pk__in=viewer_ids).values_list("pk", flat=True))
+        return Counter({
+            key: n for key, n in counts.items()
+            if key[0] in profiles and (key[1] is None or key[1] in viewers)
+        })
+
+    def reset(self):
+        with self._lock:
+            self._counts = Counter()  # (profile_id, viewer_id | None, hour) -> views
+            self._failures = 0
+            self._schedule()
+
+
+def profile_view_stats(profile_id, days, prefix, max_viewers=20):
+    """Stats for GET /api/profile/me/views/, read only from the rollup tables."""
+    since = timezone.now() - timedelta(days=days)
+    hourly = ProfileViewHourly.objects.filter(profile_id=profile_id, hour__gte=since)
+    daily = hourly.annotate(day=TruncDate("hour")).values("day").annotate(views=Sum("views")).order_by("day")
+
+    recent = list(
+        ProfileViewerRollup.objects.filter(profile_id=profile_id, hour__gte=since)
+        .values("viewer").annotate(views=Sum("views"), last_viewed=Max("hour"))
+        .order_by("-last_viewed")[:max_viewers]
+    )
+    cards = {
+        row["user_id"]: serialize_profile_card(row, prefix)
+        for row in profile_card_rows(Profile.objects.filter(user_id__in=[r["viewer"] for r in recent]), "user_id")
+    }
+    return {
+        "days": days,
+        "total": hourly.aggregate(n=Sum("views"))["n"] or 0,
+        "daily": [{"day": d["day"], "views": d["views"]} for d in daily],
+        "viewers": [
+            {**cards[r["viewer"]], "views": r["views"], "last_viewed": r["last_viewed"]}
+            for r in recent if r["viewer"] in cards
+        ],
+    }
+
+
+profile_views = ProfileViewBuffer()
+atexit.register(profile_views.flush)
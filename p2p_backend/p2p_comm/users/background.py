@@ -0,0 +1,55 @@
+# users/background.py
+"""
+Write-behind flushes off the request path.
+
+In-memory buffers (profile view counts, presence last_seen) notice on the
+request path that a flush is due and hand it to this daemon thread, so no
+request pays for the batch write. A flush that is already queued isn't queued
+again. Call the buffer's flush() directly to write synchronously (tests, atexit).
+"""
+import logging
+import queue
+import threading
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class FlushWorker:
+    """Single daemon thread running queued flush callables, each at most once at a time in the queue."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, flush):
+        with self._lock:
+            if flush in self._queued:
+                return
+            self._queued.add(flush)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="write-behind-flush", daemon=True)
+                self._thread.start()
+        self._queue.put(flush)
+
+    def _run(self):
+        while True:
+            flush = self._queue.get()
+            with self._lock:
+                self._queued.discard(flush)
+            try:
+                flush()
+            except Exception:
+                logger.exception("write-behind flush failed")
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+    def join(self):
+        self._queue.join()
+
+
+flusher = FlushWorker()
@@ -0,0 +1,137 @@
+# users/cache.py
+"""
+SQLiteCounterCache: a small cache backend shared by every process on one host.
+
+It stands in for Redis/Memcached in development and single-host deployments
+where counters (rate limits) must be shared by all worker processes. incr() and
+add() are single SQL statements, so they're atomic across processes, unlike the
+read-modify-write incr() of the file and database cache backends.
+
+    CACHES["ratelimit"] = {"BACKEND": "users.cache.SQLiteCounterCache", "LOCATION": BASE_DIR / "ratelimit.sqlite3"}
+
+Ints, floats and strings are stored as SQL values (so incr() can run in SQL);
+anything else is pickled.
+"""
+import pickle
+import random
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value,
+    expires REAL NOT NULL
+) WITHOUT ROWID
+"""
+FOREVER = float("inf")
+CULL_PROBABILITY = 0.001  # share of add() calls that also sweep expired rows
+
+
+class SQLiteCounterCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = str(location)
+        self._local = threading.local()
+
+    @property
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self._path, timeout=5, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")  # counters may lose the last moment on power loss; fine
+            db.execute(SCHEMA)
+            self._local.db = db
+        return db
+
+    def _expiry(self, timeout):
+        expires = self.get_backend_timeout(timeout)  # absolute time, or None for no expiry
+        return FOREVER if expires is None else expires
+
+    @staticmethod
+    def _dump(value):
+        if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _load(value):
+        return pickle.loads(value) if isinstance(value, bytes) else value
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._db.execute(
+            "INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires "
+            "WHERE cache.expires <= ?",
+            (key, self._dump(value), self._expiry(timeout), time.time()),
+        )
+        if random.random() < CULL_PROBABILITY:
+            self.cull()  # per-window counter keys would otherwise pile up
+        return cursor.rowcount == 1
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._db.execute(
+            "SELECT value FROM cache WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return default if row is None else self._load(row[0])
+
+    def get_many(self, keys, version=None):
+        made = {self.make_and_validate_key(k, version=version): k for k in keys}
+        if not made:
+            return {}
+        rows = self._db.execute(
+            f"SELECT key, value FROM cache WHERE key IN ({', '.join('?' * len(made))}) AND expires > ?",
+            (*made, time.time()),
+        )
+        return {made[key]: self._load(value) for key, value in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._db.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, self._dump(value), self._expiry(timeout)),
+        )
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._db.execute(
+            "UPDATE cache SET expires = ? WHERE key = ? AND expires > ?", (self._expiry(timeout), key, time.time())
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        made = self.make_and_validate_key(key, version=version)
+        row = self._db.execute(
+            "UPDATE cache SET value = value + ? WHERE key = ? AND expires > ? RETURNING value",
+            (delta, made, time.time()),
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Key '{key}' not found")
+        return row[0]
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._db.execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount == 1
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._db.execute(
+            "SELECT 1 FROM cache WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone() is not None
+
+    def clear(self):
+        self._db.execute("DELETE FROM cache")
+
+    def cull(self):
+        """Drop expired rows."""
+        return self._db.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),)).rowcount
+
+    def close(self, **kwargs):
+        # keep the per-thread connection across requests; it's cheap to hold open
+        pass
@@ -0,0 +1,126 @@
+# users/fastpath.py
+"""
+Read-only fast-path serialization for hot endpoints.
+
+These functions produce exactly the same payloads as PublicProfileSerializer and
+the dicts returned by UserViewSet, but work on `.values()` rows instead of model
+instances, so there is no per-row field machinery and the avatar blob is never
+loaded. Write paths keep using the DRF serializers.
+"""
+from django.db.models.functions import Length
+
+from .fieldsets import columns_for
+from .presence import tracker as presence
+
+# values() columns needed to render a public profile
+PUBLIC_PROFILE_VALUES = (
+    "user__username", "user__full_name",
+    "headline", "about", "location", "experiences", "links",
+    "avatar_len",
+)
+
+# public profile field -> values() columns it is rendered from, for ?fields=
+PUBLIC_PROFILE_COLUMNS = {
+    "username": ("user__username",),
+    "full_name": ("user__full_name",),
+    "headline": ("headline",),
+    "about": ("about",),
+    "location": ("location",),
+    "experiences": ("experiences",),
+    "links": ("links",),
+    "avatar_url": ("user__username", "avatar_len"),
+    "online": ("user__username",),  # from in-memory presence, see online_usernames()
+}
+PUBLIC_PROFILE_FIELDS = tuple(PUBLIC_PROFILE_COLUMNS)
+
+# compact "card" used wherever many users are rendered at once
+PROFILE_CARD_VALUES = ("user__username", "user__full_name", "headline", "avatar_len")
+
+USER_VALUES = ("id", "username", "email", "secondary_email", "batch", "is_current_student")
+
+
+def public_profile_rows(qs, *extra, fields=None):
+    """
+    Turn a Profile queryset into values() rows for serialize_public_profile.
+    Only the length of the avatar blob is selected, never its bytes; with
+    `fields`, only the columns those fields need.
+    """
+    values = PUBLIC_PROFILE_VALUES if fields is None else columns_for(fields, PUBLIC_PROFILE_COLUMNS)
+    if "avatar_len" in values:
+        qs = qs.annotate(avatar_len=Length("avatar_blob"))
+    return qs.values(*values, *extra)
+
+
+def profile_card_rows(qs, *extra):
+    return qs.annotate(avatar_len=Length("avatar_blob")).values(*PROFILE_CARD_VALUES, *extra)
+
+
+def avatar_url_prefix(request):
+    """
+    Absolute "/api/profile/" prefix, computed once per request instead of once
+    per row (build_absolute_uri re-validates the host every call).
+    """
+    return request.build_absolute_uri("/api/profile/")
+
+
+def online_usernames(rows, fields=None):
+    """
+    Which of these rows' users are online now, for the "online" field: a lookup in
+    the in-memory presence tracker, no query. None when `fields` leaves it out.
+    """
+    if fields is not None and "online" not in fields:
+        return None
+    return presence.online(row["user__username"] for row in rows)
+
+
+def serialize_public_profile(row, prefix, fields=None, online=None):
+    """
+    `online` is the set from online_usernames(). Without it there is no "online"
+    key, e.g. in delta sync, whose cards clients cache.
+    """
+    if fields is not None:
+        card = {}
+        for name in fields:
+            if name == "avatar_url":
+                card[name] = f"{prefix}{row['user__username']}/avatar/" if row["avatar_len"] else None
+            elif name == "online":
+                card[name] = row["user__username"] in online
+            else:
+                card[name] = row[PUBLIC_PROFILE_COLUMNS[name][0]]
+        return card
+    username = row["user__username"]
+    card = {
+        "username": username,
+        "full_name": row["user__full_name"],
+        "headline": row["headline"],
+        "about": row["about"],
+        "location": row["location"],
+        "experiences": row["experiences"],
+        "links": row["links"],
+        "avatar_url": f"{prefix}{username}/avatar/" if row["avatar_len"] else None,
+    }
+    if online is not None:
+        card["online"] = username in online
+    return card
+
+
+def serialize_profile_card(row, prefix):
+    username = row["user__username"]
+    return {
+        "username": username,
+        "full_name": row["user__full_name"],
+        "headline": row["headline"],
+        "avatar_url": f"{prefix}{username}/avatar/" if row["avatar_len"] else None,
+    }
+
+
+def serialize_public_profiles(rows, request, fields=None):
+    rows = list(rows)
+    prefix = avatar_url_prefix(request)
+    online = online_usernames(rows, fields)
+    return [serialize_public_profile(row, prefix, fields, online) for row in rows]
+
+
+def serialize_users(qs):
+    # values() rows already have the exact shape UserViewSet returns
+    return list(qs.values(*USER_VALUES))
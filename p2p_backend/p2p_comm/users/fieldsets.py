@@ -0,0 +1,92 @@
+# users/fieldsets.py
+"""
+Sparse fieldsets for profile endpoints: ?fields=a,b or ?exclude=c,d.
+
+The selection trims the payload and is also mapped to the columns each field is
+rendered from, so the query selects only those: an unrequested `about` or
+`experiences` is never read from the database, and its JSON never decoded.
+"""
+from django.db.models.functions import Length
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+
+from .models import Profile
+
+# readable ProfileSerializer field -> Profile columns it needs. User fields come
+# from request.user, which is already loaded; "avatar_len" is Length(avatar_blob).
+ME_PROFILE_COLUMNS = {
+    "username": (),
+    "email": (),
+    "secondary_email": (),
+    "batch": (),
+    "is_current_student": (),
+    "headline": ("headline",),
+    "about": ("about",),
+    "location": ("location",),
+    "experiences": ("experiences",),
+    "links": ("links",),
+    "avatar_url": ("avatar_len",),
+    "updated_at": ("updated_at",),
+}
+ME_PROFILE_FIELDS = tuple(ME_PROFILE_COLUMNS)
+
+
+def requested_fields(request, available):
+    """
+    Field names to render, in `available` order, from ?fields= or ?exclude=.
+    None when neither is given, meaning every field.
+    """
+    fields = request.query_params.get("fields")
+    exclude = request.query_params.get("exclude")
+    if fields is None and exclude is None:
+        return None
+    if fields is not None and exclude is not None:
+        raise ValidationError({"detail": "Pass either fields or exclude, not both."})
+    names = {name.strip() for name in (fields if fields is not None else exclude).split(",") if name.strip()}
+    unknown = names.difference(available)
+    if unknown:
+        raise ValidationError({
+            "fields" if fields is not None else "exclude":
+                f"Unknown field(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(available)}."
+        })
+    selected = tuple(f for f in available if (f in names) == (fields is not None))
+    if not selected:
+        raise ValidationError({"detail": "Select at least one field."})
+    return selected
+
+
+def columns_for(fields, columns):
+    """Ordered, de-duplicated columns needed to render `fields`."""
+    return tuple(dict.fromkeys(column for field in fields for column in columns[field]))
+
+
+def fieldset_parameters(available):
+    field_list = {"type": "array", "items": {"type": "string", "enum": list(available)}}
+    return [
+        OpenApiParameter(
+            name="fields", type=field_list, style="form", explode=False, required=False,
+            description="Comma-separated fields to return (default: all). Unrequested columns are not queried.",
+        ),
+        OpenApiParameter(
+            name="exclude", type=field_list, style="form", explode=False, required=False,
+            description="Comma-separated fields to leave out. Cannot be combined with `fields`.",
+        ),
+    ]
+
+
+def me_profile(user, fields=None):
+    """
+    `user`'s Profile (created if missing) with only the columns `fields` need;
+    the avatar blob is never loaded, only its length. `profile.user` is `user`.
+    """
+    columns = columns_for(fields or ME_PROFILE_FIELDS, ME_PROFILE_COLUMNS)
+    qs = Profile.objects.filter(user=user)
+    if "avatar_len" in columns:
+        qs = qs.annotate(avatar_len=Length("avatar_blob"))
+    qs = qs.only("user", *(c for c in columns if c != "avatar_len"))
+    profile = qs.first()
+    if profile is None:
+        Profile.objects.get_or_create(user=user)
+        profile = qs.first()
+    profile.user = user
+    return profile
@@ -0,0 +1,38 @@
+# users/management/commands/bench_profile_views.py
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from users.analytics import ProfileViewBuffer
+
+
+class Command(BaseCommand):
+    help = "Measure the request-path cost of recording a profile view (in-process buffering only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--views", type=int, default=200_000)
+        parser.add_argument("--profiles", type=int, default=1000)
+        parser.add_argument("--viewers", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        # flushing is disabled so only record() is timed: that is all a request pays, since due
+        # flushes are handed to the background flush thread (users/background.py)
+        with override_settings(PROFILE_VIEW_COUNTERS={"FLUSH_INTERVAL": 10**9, "FLUSH_SIZE": 10**9}):
+            buffer = ProfileViewBuffer()
+        n = options["views"]
+        # skewed towards a few popular profiles, a third anonymous
+        profiles = [int(random.paretovariate(1.2)) % options["profiles"] for _ in range(n)]
+        viewers = [random.randrange(options["viewers"]) if i % 3 else None for i in range(n)]
+
+        start = time.perf_counter()
+        for profile_id, viewer_id in zip(profiles, viewers):
+            buffer.record(profile_id, viewer_id)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"{n} views -> {len(buffer._counts)} buffered rows "
+            f"({n / len(buffer._counts):.1f} views per row written) | "
+            f"{elapsed / n * 1e6:.2f} us per record()"
+        )
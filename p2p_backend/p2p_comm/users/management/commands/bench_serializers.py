@@ -0,0 +1,68 @@
+# users/management/commands/bench_serializers.py
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from users.fastpath import serialize_public_profiles
+from users.models import CustomUser, Profile
+from users.renderers import ORJSONRenderer
+from users.serializers import PublicProfileSerializer
+
+
+def make_profiles(n):
+    """
+    Build n unsaved profiles (and the equivalent values() rows) so the benchmark
+    measures serialization only, not the database.
+    """
+    profiles, rows = [], []
+    for i in range(n):
+        user = CustomUser(id=i + 1, username=f"student.{i:05d}", full_name=f"Student Number {i}")
+        profile = Profile(
+            id=i + 1, user=user,
+            headline="B.Tech CSE | Backend developer",
+            about="Interested in distributed systems and peer-to-peer networks. " * 3,
+            location="Bhagalpur, India",
+            experiences=[{"title": "Intern", "company": f"Company {j}", "years": "2024"} for j in range(3)],
+            links=[{"label": "GitHub", "url": f"https://github.com/student{i}"}],
+            avatar_blob=b"\x89PNG" if i % 2 else None,
+        )
+        profiles.append(profile)
+        rows.append({
+            "user__username": user.username, "user__full_name": user.full_name,
+            "headline": profile.headline, "about": profile.about, "location": profile.location,
+            "experiences": profile.experiences, "links": profile.links,
+            "avatar_len": len(profile.avatar_blob) if profile.avatar_blob else None,
+        })
+    return profiles, rows
+
+
+class Command(BaseCommand):
+    help = "Compare DRF serializer + json rendering against the fast path + orjson for public profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[50, 1000])
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/api/profile/search/", HTTP_HOST="localhost")
+        drf_renderer, fast_renderer = JSONRenderer(), ORJSONRenderer()
+
+        for size in options["sizes"]:
+            profiles, rows = make_profiles(size)
+            number = max(1, 5000 // size)
+
+            def baseline():
+                data = PublicProfileSerializer(profiles, many=True, context={"request": request}).data
+                return drf_renderer.render(data)
+
+            def fast():
+                return fast_renderer.render(serialize_public_profiles(rows, request))
+
+            slow_t = min(timeit.repeat(baseline, number=number, repeat=options["repeat"])) / number
+            fast_t = min(timeit.repeat(fast, number=number, repeat=options["repeat"])) / number
+            self.stdout.write(
+                f"{size:>6} rows: serializer+json {slow_t * 1000:8.3f} ms | "
+                f"fastpath+orjson {fast_t * 1000:8.3f} ms | speedup x{slow_t / fast_t:.1f}"
+            )
@@ -0,0 +1,12 @@
+# users/management/commands/build_openapi_schema.py
+from django.core.management.base import BaseCommand
+
+from p2p_comm.schema import write_schema_artifact
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema once into a versioned file served by /api/schema/."
+
+    def handle(self, *args, **options):
+        path = write_schema_artifact()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
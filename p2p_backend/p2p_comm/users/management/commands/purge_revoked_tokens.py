@@ -0,0 +1,13 @@
+# users/management/commands/purge_revoked_tokens.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = "Delete revoked-token rows whose token has expired anyway (run from cron)."
+
+    def handle(self, *args, **options):
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted} expired revoked token(s)."))
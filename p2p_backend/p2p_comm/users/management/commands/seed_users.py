@@ -0,0 +1,130 @@
+# users/management/commands/seed_users.py
+import random
+import struct
+import time
+import zlib
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from users.models import CustomUser, Profile
+
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Aditya", "Ananya", "Arjun", "Bhavya", "Deepak", "Divya", "Gaurav", "Ishita",
+    "Karan", "Kavya", "Manish", "Meera", "Neha", "Nikhil", "Pooja", "Priya", "Rahul", "Riya",
+    "Rohan", "Sakshi", "Sanjay", "Shreya", "Siddharth", "Sneha", "Tanvi", "Utkarsh", "Vikram", "Zoya",
+]
+LAST_NAMES = [
+    "Agarwal", "Bhat", "Choudhary", "Das", "Gupta", "Iyer", "Jha", "Kumar", "Mishra", "Nair",
+    "Pandey", "Patel", "Rao", "Reddy", "Roy", "Saxena", "Sharma", "Singh", "Sinha", "Verma",
+]
+BRANCHES = ["CSE", "ECE", "MnC"]
+TITLES = [
+    "Software Engineering Intern", "Backend Developer", "ML Research Intern", "SDE I", "SDE II",
+    "Data Analyst", "Frontend Developer", "Teaching Assistant", "Open Source Contributor", "Product Intern",
+]
+COMPANIES = [
+    "Google", "Microsoft", "Amazon", "Flipkart", "Razorpay", "Zomato", "Atlassian", "Adobe",
+    "Samsung R&D", "Goldman Sachs", "IIIT Bhagalpur", "GSoC",
+]
+CITIES = ["Bhagalpur", "Patna", "Bengaluru", "Hyderabad", "Pune", "Gurugram", "Noida", "Kolkata"]
+INTERESTS = ["distributed systems", "competitive programming", "embedded systems", "web development",
+             "machine learning", "computer vision", "networks", "compilers"]
+
+
+def solid_png(rgb, size=64):
+    """A small valid PNG of one colour, so seeded avatars render in clients."""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    raw = (b"\x00" + bytes(rgb) * size) * size
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 9))
+        + chunk(b"IEND", b"")
+    )
+
+
+def month(index):
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+def fake_profile(rng, batch, now):
+    # months since year 0, so roles can't start before the intake or end in the future
+    joined, today = int(batch) * 12 + 7, now.year * 12 + now.month - 1
+    experiences = []
+    for _ in range(rng.choices([0, 1, 2, 3, 4], weights=[3, 4, 3, 2, 1])[0]):
+        began = rng.randint(min(joined + 10, today), today)
+        ended = began + rng.randint(2, 24)
+        experiences.append({
+            "title": rng.choice(TITLES),
+            "company": rng.choice(COMPANIES),
+            "start": month(began),
+            "end": month(ended) if ended <= today else None,
+        })
+    return {
+        "headline": f"{rng.choice(BRANCHES)} '{batch[-2:]} | {experiences[0]['title'] if experiences else 'Student'}",
+        "about": " ".join(
+            f"Interested in {a} and {b}." for a, b in (rng.sample(INTERESTS, 2) for _ in range(rng.randint(0, 3)))
+        ),
+        "location": f"{rng.choice(CITIES)}, India",
+        "experiences": experiences,
+    }
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert N synthetic users with realistic profiles (for load testing and EXPLAIN checks)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int)
+        parser.add_argument("--batches", nargs=2, type=int, default=[2017, 2025], metavar=("FIRST", "LAST"))
+        parser.add_argument("--avatars", type=float, default=0.3, help="Share of profiles with an avatar")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--password", help="Shared password for every seeded user (default: unusable)")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batches = [str(y) for y in range(options["batches"][0], options["batches"][1] + 1)]
+        now = timezone.now()
+        current_from = now.year - 3  # the last four intakes are still studying
+        # hashed once: per-user hashing would dominate the run
+        password = make_password(options["password"])
+        avatars = [solid_png((rng.randrange(256), rng.randrange(256), rng.randrange(256))) for _ in range(16)]
+        offset = (CustomUser.objects.aggregate(last=Max("id"))["last"] or 0) + 1  # keeps usernames unique
+
+        total, chunk_size = options["count"], options["chunk_size"]
+        start = time.perf_counter()
+        for first in range(0, total, chunk_size):
+            users, profiles = [], []
+            for i in range(offset + first, offset + min(first + chunk_size, total)):
+                given, family, batch = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), rng.choice(batches)
+                username = f"{given}.{family}.{i}".lower()
+                users.append(CustomUser(
+                    username=username, email=f"{username}@iiitbh.ac.in", password=password,
+                    full_name=f"{given} {family}", batch=batch, is_current_student=int(batch) >= current_from,
+                ))
+                avatar = rng.choice(avatars) if rng.random() < options["avatars"] else None
+                profiles.append(Profile(
+                    **fake_profile(rng, batch, now),
+                    links=[{"label": "GitHub", "url": f"https://github.com/{username.replace('.', '-')}"}]
+                    + ([{"label": "LinkedIn", "url": f"https://www.linkedin.com/in/{username}"}] if rng.random() < 0.6 else []),
+                    avatar_blob=avatar, avatar_content_type="image/png" if avatar else None,
+                    avatar_filename="avatar.png" if avatar else None, avatar_size=len(avatar) if avatar else None,
+                ))
+            # bulk_create skips the post_save hook that would create each profile one by one
+            with transaction.atomic():
+                CustomUser.objects.bulk_create(users)
+                for user, profile in zip(users, profiles):
+                    profile.user_id = user.pk
+                Profile.objects.bulk_create(profiles)
+            done = first + len(users)
+            self.stdout.write(f"{done}/{total} users ({done / (time.perf_counter() - start):.0f}/s)", ending="\r")
+
+        if connection.vendor in ("sqlite", "postgresql"):
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")  # fresh planner statistics for the new rows
+        self.stdout.write(f"\nSeeded {total} users with profiles in {time.perf_counter() - start:.1f}s")
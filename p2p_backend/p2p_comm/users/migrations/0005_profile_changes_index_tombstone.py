@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_customuser_full_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfileTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("username", models.CharField(max_length=150)),
+                ("user_id", models.BigIntegerField()),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[("deleted", "Deleted"), ("renamed", "Renamed")],
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["updated_at", "id"], name="profile_updated_id_idx"
+            ),
+        ),
+    ]
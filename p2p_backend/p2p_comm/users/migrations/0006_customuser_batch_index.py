@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_profile_changes_index_tombstone"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customuser",
+            name="batch",
+            field=models.CharField(blank=True, db_index=True, max_length=10),
+        ),
+    ]
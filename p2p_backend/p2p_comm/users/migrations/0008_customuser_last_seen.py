@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0007_token_revocation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="last_seen",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
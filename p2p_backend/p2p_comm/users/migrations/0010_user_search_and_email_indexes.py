@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0009_profile_view_rollups"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customuser",
+            name="full_name",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(
+                fields=["full_name", "username"], name="user_fullname_username_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="user_email_lower_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0010_user_search_and_email_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="profiletombstone",
+            index=models.Index(
+                fields=["created_at", "id"], name="tombstone_created_id_idx"
+            ),
+        ),
+    ]
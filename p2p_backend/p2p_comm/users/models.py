@@ -1,7 +1,10 @@
 # users/models.py
 from django.db import models
+from django.db.models.functions import Lower
+from django.contrib.auth.hashers import is_password_usable
 from django.contrib.auth.models import AbstractUser
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save, post_delete
+from django.utils import timezone
 from django.dispatch import receiver
 from django.conf import settings
 
@@ -9,13 +12,23 @@ class CustomUser(AbstractUser):
     # keep first_name, last_name, username fields from AbstractUser
     email = models.EmailField(unique=True)
     secondary_email = models.EmailField(blank=True, null=True)
-    batch = models.CharField(max_length=10, blank=True)  # e.g., "2022"
+    batch = models.CharField(max_length=10, blank=True, db_index=True)  # e.g., "2022"
     is_current_student = models.BooleanField(default=True)  # True=current, False=alumni
-    full_name = models.CharField(max_length=255, blank=True, db_index=True)
+    full_name = models.CharField(max_length=255, blank=True)
+    # written behind by users/presence.py, at most every PRESENCE["PERSIST_INTERVAL"] seconds
+    last_seen = models.DateTimeField(blank=True, null=True)
 
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = ["email"]
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # search orders by (full_name, username); the index yields that order so LIMIT stops early
+            models.Index(fields=["full_name", "username"], name="user_fullname_username_idx"),
+            # case-insensitive email lookups (registration check) filter on LOWER(email)
+            models.Index(Lower("email"), name="user_email_lower_idx"),
+        ]
+
     def __str__(self):
         return self.username
     
@@ -40,12 +53,131 @@ class Profile(models.Model):
     avatar_filename = models.CharField(max_length=255, blank=True, null=True)
     avatar_size = models.PositiveIntegerField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination for GET /api/profile/changes/
+            models.Index(fields=["updated_at", "id"], name="profile_updated_id_idx"),
+        ]
+
     def has_avatar(self):
+        if "avatar_len" in self.__dict__:  # blob deferred, Length() annotated (users/fieldsets.py)
+            return bool(self.avatar_len)
         return bool(self.avatar_blob)
     def __str__(self):
         return f"Profile<{self.user.username}>"
 
+class ProfileTombstone(models.Model):
+    """
+    Public username that disappeared from the directory (user deleted or renamed),
+    so delta-sync clients can drop it from their local cache.
+    """
+    REASON_DELETED = "deleted"
+    REASON_RENAMED = "renamed"
+    REASON_CHOICES = [(REASON_DELETED, "Deleted"), (REASON_RENAMED, "Renamed")]
+
+    username = models.CharField(max_length=150)
+    user_id = models.BigIntegerField()  # plain id: the user row may be gone
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # keyset pagination for GET /api/profile/changes/, interleaved with profiles by time
+            models.Index(fields=["created_at", "id"], name="tombstone_created_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"Tombstone<{self.username} {self.reason}>"
+
+class TokenWatermark(models.Model):
+    """
+    "Every token for this user issued at or before not_before is invalid."
+    Bumped on logout-everywhere, password change and deactivation.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="+")
+    not_before = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # sync cursor
+
+    def __str__(self):
+        return f"TokenWatermark<{self.user_id} {self.not_before}>"
+
+class RevokedToken(models.Model):
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)  # safe to forget after this
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)  # sync cursor
+
+    def __str__(self):
+        return f"RevokedToken<{self.jti}>"
+
+class ProfileViewHourly(models.Model):
+    """Rollup of public profile views per profile per hour (written in bulk by users/analytics.py)."""
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="+")
+    hour = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["profile", "hour"], name="profile_view_hourly_uniq")]
+
+class ProfileViewerRollup(models.Model):
+    """Signed-in viewers of a profile per hour, for "who viewed your profile"."""
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="+")
+    viewer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    hour = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["profile", "viewer", "hour"], name="profile_viewer_rollup_uniq")]
+        indexes = [models.Index(fields=["profile", "hour"], name="profile_viewer_hour_idx")]
+
+# user fields that are part of the public profile card
+PUBLIC_USER_FIELDS = ("username", "full_name")
+# fields whose change invalidates every issued token
+CREDENTIAL_USER_FIELDS = ("password", "is_active")
+
+@receiver(pre_save, sender=CustomUser)
+def remember_tracked_fields(sender, instance, update_fields=None, **kwargs):
+    instance._previous_values = None
+    if instance.pk is None:
+        return
+    tracked = PUBLIC_USER_FIELDS + CREDENTIAL_USER_FIELDS
+    if update_fields is not None and not set(update_fields) & set(tracked):
+        return  # e.g. last_login bumps on login
+    instance._previous_values = sender.objects.filter(pk=instance.pk).values(*tracked).first()
+
 @receiver(post_save, sender=CustomUser)
 def ensure_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
+        return
+    previous = getattr(instance, "_previous_values", None)
+    if not previous:
+        return
+    if previous["username"] != instance.username:
+        ProfileTombstone.objects.create(
+            username=previous["username"], user_id=instance.pk, reason=ProfileTombstone.REASON_RENAMED
+        )
+    if any(previous[f] != getattr(instance, f) for f in PUBLIC_USER_FIELDS):
+        # the public card changed even though the profile row didn't; bump it for delta sync
+        Profile.objects.filter(user=instance).update(updated_at=timezone.now())
+    if _credentials_changed(previous, instance):
+        from .revocation import registry
+        registry.revoke_user(instance.pk)
+
+def _credentials_changed(previous, instance):
+    if previous["is_active"] and not instance.is_active:
+        return True
+    if previous["password"] == instance.password:
+        return False
+    if not is_password_usable(previous["password"]):
+        return False  # first usable password (registration): there are no earlier tokens
+    if not is_password_usable(instance.password):
+        return True  # set_unusable_password()
+    # only set_password() leaves the raw password in _password until save(); a hasher upgrade
+    # in check_password() re-saves the same secret without it
+    return instance._password is not None
+
+@receiver(post_delete, sender=CustomUser)
+def record_deleted_user(sender, instance, **kwargs):
+    ProfileTombstone.objects.create(
+        username=instance.username, user_id=instance.pk, reason=ProfileTombstone.REASON_DELETED
+    )
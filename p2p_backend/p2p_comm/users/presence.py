@@ -0,0 +1,167 @@
+# users/presence.py
+"""
+Presence ("online now") and typing indicators kept in memory.
+
+Heartbeats only touch dictionaries; expiry is driven by a min-heap of deadlines,
+so an idle user drops offline without any sweep over all users. Repeated beats
+inside the COALESCE window don't push new heap entries, and `last_seen` is
+written to the database behind the request path, at most once per
+PERSIST_INTERVAL, as batched UPDATEs covering every user seen in that window.
+The write runs on the background flush thread (users/background.py), which
+also sweeps expired typing indicators and the last_seen of offline users
+(lookups fall back to the persisted value).
+
+State is per process; run presence behind a single worker (or sticky routing)
+if exact cross-process answers matter.
+"""
+import atexit
+import heapq
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from .background import flusher
+
+DEFAULTS = {
+    "TTL": 60,               # seconds without a heartbeat before a user is offline
+    "COALESCE": 15,          # heartbeats closer together than this don't reschedule expiry
+    "TYPING_TTL": 6,         # seconds a typing indicator lasts
+    "PERSIST_INTERVAL": 120, # seconds between last_seen write-behind flushes
+}
+
+FLUSH_CHUNK = 500  # users per UPDATE ... CASE statement
+
+
+def presence_settings():
+    return {**DEFAULTS, **getattr(settings, "PRESENCE", {})}
+
+
+class PresenceTracker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._expires = {}     # username -> monotonic deadline
+            self._heap = []        # (deadline, username); stale entries are skipped
+            self._last_seen = {}   # username -> aware datetime
+            self._dirty = {}       # username -> last_seen not yet written to the DB
+            self._typing = {}      # recipient -> {sender: monotonic deadline}
+            self._next_flush = time.monotonic() + presence_settings()["PERSIST_INTERVAL"]
+
+    # -- writes -------------------------------------------------------------
+
+    def heartbeat(self, username):
+        conf = presence_settings()
+        now = time.monotonic()
+        seen = timezone.now()
+        with self._lock:
+            self._last_seen[username] = self._dirty[username] = seen
+            deadline = self._expires.get(username)
+            if deadline is None or deadline - conf["TTL"] + conf["COALESCE"] <= now:
+                deadline = now + conf["TTL"]
+                self._expires[username] = deadline
+                heapq.heappush(self._heap, (deadline, username))
+            self._expire(now)
+        self._maybe_flush(now)
+
+    def typing(self, username, to):
+        deadline = time.monotonic() + presence_settings()["TYPING_TTL"]
+        with self._lock:
+            self._typing.setdefault(to, {})[username] = deadline
+        self.heartbeat(username)
+
+    def _expire(self, now):
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, username = heapq.heappop(heap)
+            if self._expires.get(username) == deadline:
+                del self._expires[username]
+
+    # -- reads --------------------------------------------------------------
+
+    def lookup(self, usernames):
+        """
+        {username: {"online": bool, "last_seen": datetime | None}} for a list of
+        usernames. Users not seen by this process fall back to the stored
+        last_seen in one query.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            result = {
+                u: {"online": u in self._expires, "last_seen": self._last_seen.get(u)}
+                for u in usernames
+            }
+        unknown = [u for u, p in result.items() if p["last_seen"] is None]
+        if unknown:
+            User = get_user_model()
+            for username, last_seen in User.objects.filter(username__in=unknown).values_list("username", "last_seen"):
+                result[username]["last_seen"] = last_seen
+        return result
+
+    def online(self, usernames):
+        """The subset of `usernames` online now, for "online" dots on profile cards. Never queries."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            return {u for u in usernames if u in self._expires}
+
+    def typing_to(self, username):
+        now = time.monotonic()
+        with self._lock:
+            senders = self._typing.get(username, {})
+            for sender in [s for s, deadline in senders.items() if deadline <= now]:
+                del senders[sender]
+            if not senders:
+                self._typing.pop(username, None)
+            return sorted(senders)
+
+    # -- write-behind -------------------------------------------------------
+
+    def _maybe_flush(self, now):
+        if now >= self._next_flush:
+            with self._lock:
+                self._next_flush = now + presence_settings()["PERSIST_INTERVAL"]  # submit once per interval
+            flusher.submit(self.flush)
+
+    def flush(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            self._next_flush = time.monotonic() + presence_settings()["PERSIST_INTERVAL"]
+        User = get_user_model()
+        items = list(dirty.items())
+        updated = 0
+        for i in range(0, len(items), FLUSH_CHUNK):
+            chunk = items[i:i + FLUSH_CHUNK]
+            updated += User.objects.filter(username__in=[u for u, _ in chunk]).update(
+                last_seen=Case(
+                    *[When(username=u, then=Value(seen)) for u, seen in chunk],
+                    output_field=DateTimeField(),
+                )
+            )
+        self._sweep(time.monotonic())
+        return updated
+
+    def _sweep(self, now):
+        with self._lock:
+            self._expire(now)
+            for to, senders in list(self._typing.items()):
+                live = {s: deadline for s, deadline in senders.items() if deadline > now}
+                if live:
+                    self._typing[to] = live
+                else:
+                    del self._typing[to]
+            # offline and already written: lookup() reads it back from the database
+            self._last_seen = {
+                u: seen for u, seen in self._last_seen.items() if u in self._expires or u in self._dirty
+            }
+
+
+tracker = PresenceTracker()
+atexit.register(tracker.flush)
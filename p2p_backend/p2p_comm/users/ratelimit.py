@@ -0,0 +1,155 @@
+# users/ratelimit.py
+"""
+Sliding-window rate limiting on a shared cache.
+
+Each limited key keeps one counter per fixed window in the cache named by
+RATELIMITS["CACHE"]; the sliding-window estimate weights the previous window
+by how much of it still overlaps:
+
+    estimate = previous * (1 - elapsed / window) + current
+
+The current counter is bumped with an atomic incr() (add() on a window's first
+hit), so concurrent processes never lose updates the way a get-then-set
+throttle does. Once a key is over its limit, this process remembers until when
+it will certainly stay blocked and rejects it locally, without a round trip.
+
+Limits are per view scope and key, e.g. RATELIMITS["SCOPES"]["login"] =
+{"ip": "30/m", "data:username": "10/m"}. Keys are "ip", "user" (authenticated
+users only) or "data:<field>" (a request body field, case-insensitive). "ip" is
+DRF's client ident, so it honours X-Forwarded-For only as far as
+REST_FRAMEWORK["NUM_PROXIES"] trusts it.
+"""
+import hashlib
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import BaseThrottle
+
+DEFAULTS = {
+    "ENABLED": True,
+    "CACHE": "default",   # must be shared by all processes (Redis, Memcached, users.cache.SQLiteCounterCache)
+    "SCOPES": {},
+}
+
+RATE_RE = re.compile(r"^(\d+)/(\d*)([smhd])$")
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+MAX_LOCAL_BLOCKS = 10_000
+
+
+def ratelimit_settings():
+    return {**DEFAULTS, **getattr(settings, "RATELIMITS", {})}
+
+
+def parse_rate(rate):
+    """"10/m" -> (10, 60); "100/15m" -> (100, 900)."""
+    match = RATE_RE.match(rate.replace(" ", ""))
+    if not match:
+        raise ImproperlyConfigured(f"Invalid rate {rate!r}; use e.g. '10/m' or '100/15m'.")
+    limit, count, unit = match.groups()
+    return int(limit), int(count or 1) * UNITS[unit]
+
+
+def retry_after(previous, current, limit, window, elapsed):
+    """Seconds until the estimate drops back to `limit`, assuming no further hits."""
+    if current < limit and previous:
+        # still inside this window: the previous window's weight decays
+        return max(window * (1 - (limit - current) / previous) - elapsed, 0.0)
+    # only in a later window, once this window's count has decayed enough
+    return (window - elapsed) + window * (1 - limit / current)
+
+
+class SlidingWindowLimiter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._blocked = {}  # key -> monotonic time until which it is certainly over the limit
+
+    def blocked(self, key):
+        """Seconds `key` is still known to be over its limit in this process, else 0."""
+        blocked_until = self._blocked.get(key)
+        if blocked_until is None:
+            return 0.0
+        remaining = blocked_until - time.monotonic()
+        if remaining > 0:
+            return remaining
+        with self._lock:
+            self._blocked.pop(key, None)
+        return 0.0
+
+    def hit(self, key, limit, window):
+        """Count one request against `key` in the shared cache. Returns (allowed, retry_after_seconds)."""
+        cache = caches[ratelimit_settings()["CACHE"]]
+        now = time.time()
+        index = int(now // window)
+        elapsed = now - index * window
+        current_key = f"rl:{key}:{index}"
+        try:
+            current = cache.incr(current_key)
+        except ValueError:  # first hit of the window
+            if cache.add(current_key, 1, timeout=2 * window + 1):
+                current = 1
+            else:  # another process created it first
+                current = cache.incr(current_key)
+        previous = cache.get(f"rl:{key}:{index - 1}", 0)
+
+        if previous * (1 - elapsed / window) + current <= limit:
+            return True, 0.0
+        wait = retry_after(previous, current, limit, window, elapsed)
+        mono = time.monotonic()
+        with self._lock:
+            if len(self._blocked) >= MAX_LOCAL_BLOCKS:
+                self._blocked = {k: t for k, t in self._blocked.items() if t > mono}
+            self._blocked[key] = mono + wait
+        return False, wait
+
+
+limiter = SlidingWindowLimiter()
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Throttle for views with a `throttle_scope` listed in RATELIMITS["SCOPES"]."""
+
+    def allow_request(self, request, view):
+        conf = ratelimit_settings()
+        scope = getattr(view, "throttle_scope", None)
+        rules = conf["SCOPES"].get(scope) if conf["ENABLED"] else None
+        self._wait = None
+        keys = []
+        for key_name, rate in (rules or {}).items():
+            ident = self.get_key(request, key_name)
+            if ident is not None:
+                digest = hashlib.blake2b(ident.encode(), digest_size=12).hexdigest()  # cache-key safe
+                keys.append((f"{scope}:{key_name}:{digest}", rate))
+
+        # local pre-check: a key already known to be blocked costs no shared round trip
+        for key, _ in keys:
+            wait = limiter.blocked(key)
+            if wait:
+                self._wait = wait
+                return False
+        for key, rate in keys:
+            allowed, wait = limiter.hit(key, *parse_rate(rate))
+            if not allowed:
+                self._wait = wait
+                return False
+        return True
+
+    def get_key(self, request, key_name):
+        if key_name == "ip":
+            return self.get_ident(request)
+        if key_name == "user":
+            return str(request.user.pk) if request.user and request.user.is_authenticated else None
+        if key_name.startswith("data:"):
+            value = request.data.get(key_name[5:]) if hasattr(request.data, "get") else None
+            return value.strip().lower() if isinstance(value, str) and value.strip() else None
+        raise ImproperlyConfigured(f"Unknown rate limit key {key_name!r}; use 'ip', 'user' or 'data:<field>'.")
+
+    def wait(self):
+        return self._wait
@@ -0,0 +1,62 @@
+# users/renderers.py
+"""
+orjson-backed renderer/parser for DRF.
+
+orjson is optional: when it isn't installed both classes fall back to the
+stock DRF JSON implementations, so settings can reference them unconditionally.
+"""
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# DRF's encoder knows how to handle lazy strings, Decimals, querysets etc.
+_fallback_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    Same media type and output shape as JSONRenderer, encoded with orjson.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        option = orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # orjson only supports 2-space indentation (browsable API / ?indent=)
+            option |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=_fallback_default, option=option)
+        # keep output a strict javascript subset, like JSONRenderer does
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class ORJSONParser(JSONParser):
+    """
+    Parses JSON request bodies with orjson.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            raw = stream.read() if stream is not None else b""
+            if encoding.lower().replace("-", "") != "utf8":
+                raw = raw.decode(encoding).encode("utf-8")
+            return orjson.loads(raw)
+        except (ValueError, UnicodeError) as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
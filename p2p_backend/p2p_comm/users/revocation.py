@@ -0,0 +1,170 @@
+# users/revocation.py
+"""
+JWT revocation without a database lookup per request.
+
+Each process keeps a compact copy of the revocation state:
+  - per-user watermarks: tokens issued before `not_before` are invalid
+    (logout everywhere, password change, deactivation);
+  - a bloom filter of revoked JTIs (single-token logout).
+
+The shared store is the TokenWatermark / RevokedToken tables. The local copy is
+refreshed from them at most every SYNC_INTERVAL seconds, so checks on the request
+path are dictionary/bit lookups. Only a bloom filter hit (a revoked token, or a
+rare false positive) is confirmed against the database.
+Revocations made in this process apply immediately; other processes see them
+within one sync interval.
+
+"iat" is whole seconds, so a watermark rejects every token issued in its second
+too (`iat <= not_before`); login waits for the next second (await_fresh_iat) so
+a token issued right after a revocation isn't rejected with it. Expired
+RevokedToken rows are removed by `manage.py purge_revoked_tokens`.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .models import RevokedToken, TokenWatermark
+
+DEFAULTS = {
+    "SYNC_INTERVAL": 5,           # seconds between syncs with the shared store
+    "REBUILD_INTERVAL": 3600,     # seconds between full reloads (drops expired JTIs)
+    "BLOOM_CAPACITY": 100_000,
+    "BLOOM_ERROR_RATE": 0.001,
+}
+
+
+def revocation_settings():
+    return {**DEFAULTS, **getattr(settings, "TOKEN_REVOCATION", {})}
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RevocationRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._watermarks = {}  # str(user_id) -> unix seconds
+            self._bloom = None
+            self._last_sync = None
+            self._next_sync = 0.0
+            self._next_rebuild = 0.0
+
+    # -- request path -------------------------------------------------------
+
+    def is_revoked(self, payload):
+        self._maybe_sync()
+        user_id = payload.get(jwt_settings.USER_ID_CLAIM)
+        not_before = self._watermarks.get(str(user_id))
+        if not_before is not None and payload.get("iat", 0) <= not_before:
+            return True
+        jti = payload.get(jwt_settings.JTI_CLAIM)
+        if jti and jti in self._bloom:
+            return RevokedToken.objects.filter(jti=jti).exists()
+        return False
+
+    # -- revoking -----------------------------------------------------------
+
+    def revoke_token(self, token):
+        jti = token.payload[jwt_settings.JTI_CLAIM]
+        expires_at = datetime.fromtimestamp(token.payload["exp"], tz=dt_timezone.utc)
+        RevokedToken.objects.get_or_create(jti=jti, defaults={"expires_at": expires_at})
+        self._maybe_sync()
+        with self._lock:
+            self._bloom.add(jti)
+
+    def revoke_user(self, user_id):
+        now = timezone.now()
+        TokenWatermark.objects.update_or_create(user_id=user_id, defaults={"not_before": now})
+        with self._lock:
+            # whole seconds, like the "iat" claim; tokens from this second are rejected too
+            self._watermarks[str(user_id)] = int(now.timestamp())
+
+    def await_fresh_iat(self, user_id):
+        """
+        Called before issuing tokens: if the user was revoked during the current
+        second, sleep into the next one so the new token's "iat" is past the watermark.
+        """
+        not_before = TokenWatermark.objects.filter(user_id=user_id).values_list("not_before", flat=True).first()
+        if not_before is not None:
+            wait = int(not_before.timestamp()) + 1 - time.time()
+            if 0 < wait <= 1:  # a watermark further ahead is clock skew; don't hang the login on it
+                time.sleep(wait)
+
+    # -- syncing ------------------------------------------------------------
+
+    def _maybe_sync(self):
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        with self._lock:
+            if now < self._next_sync:
+                return
+            conf = revocation_settings()
+            if now >= self._next_rebuild or self._bloom is None:
+                self._rebuild(conf)
+                self._next_rebuild = now + conf["REBUILD_INTERVAL"]
+            else:
+                self._sync(conf)
+            self._next_sync = now + conf["SYNC_INTERVAL"]
+
+    def _rebuild(self, conf):
+        now = timezone.now()
+        # a watermark older than the longest token lifetime can't reject anything
+        horizon = now - max(jwt_settings.ACCESS_TOKEN_LIFETIME, jwt_settings.REFRESH_TOKEN_LIFETIME)
+        watermarks = {}
+        for user_id, nb in TokenWatermark.objects.filter(not_before__gte=horizon).values_list("user_id", "not_before"):
+            watermarks[str(user_id)] = int(nb.timestamp())
+        self._watermarks = watermarks  # swapped in whole; readers don't take the lock
+
+        live = RevokedToken.objects.filter(expires_at__gt=now)
+        capacity = max(conf["BLOOM_CAPACITY"], 2 * live.count())
+        bloom = BloomFilter(capacity, conf["BLOOM_ERROR_RATE"])
+        for jti in live.values_list("jti", flat=True).iterator():
+            bloom.add(jti)
+        self._bloom = bloom
+        self._last_sync = now
+
+    def _sync(self, conf):
+        now = timezone.now()
+        # overlap by one interval so rows committed late aren't missed (re-adding is harmless)
+        since = self._last_sync - timedelta(seconds=conf["SYNC_INTERVAL"])
+        for user_id, nb in TokenWatermark.objects.filter(updated_at__gte=since).values_list("user_id", "not_before"):
+            self._watermarks[str(user_id)] = int(nb.timestamp())
+        for jti in RevokedToken.objects.filter(created_at__gte=since).values_list("jti", flat=True):
+            self._bloom.add(jti)
+        self._last_sync = now
+
+        if self._bloom.count > self._bloom.capacity:
+            self._next_rebuild = 0.0  # grow on the next sync
+
+
+registry = RevocationRegistry()
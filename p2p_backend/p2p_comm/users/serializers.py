@@ -2,10 +2,16 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from django.db.models.functions import Lower
 from .models import Profile
 from .utils import make_username_from_email
 from rest_framework.validators import UniqueValidator
 from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+from .presence import tracker as presence
+from .revocation import registry
 import base64
 
 
@@ -20,22 +26,92 @@ class RegistrationSerializer(serializers.Serializer):
     def validate_college_email(self, value):
         if not value.lower().endswith(COLLEGE_DOMAIN):
             raise serializers.ValidationError("Registration requires a college email.")
-        if User.objects.filter(email__iexact=value).exists():
+        # LOWER(email) = ... rather than email__iexact, so it can use user_email_lower_idx
+        if User.objects.alias(email_lower=Lower("email")).filter(email_lower=value.lower()).exists():
             raise serializers.ValidationError("A user with this college email already exists.")
         return value.lower()
 
+class RevocationAwareTokenObtainPairSerializer(TokenObtainPairSerializer):
+    # a token issued in the same second as a logout-everywhere would be born revoked
+    @classmethod
+    def get_token(cls, user):
+        registry.await_fresh_iat(user.pk)
+        return super().get_token(user)
+
+class RevocationAwareTokenRefreshSerializer(TokenRefreshSerializer):
+    # refuse to mint access tokens from a revoked refresh token
+    def validate(self, attrs):
+        if registry.is_revoked(self.token_class(attrs["refresh"]).payload):
+            raise InvalidToken({"detail": "Token has been revoked.", "code": "token_revoked"})
+        return super().validate(attrs)
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+    everywhere = serializers.BooleanField(default=False)  # revoke every session of this user
+
+    def validate_refresh(self, value):
+        try:
+            return RefreshToken(value)
+        except TokenError:
+            raise serializers.ValidationError("Invalid refresh token.")
+
+MAX_PROFILE_BATCH = 300  # usernames per POST /api/profile/batch/
+
+class ProfileBatchSerializer(serializers.Serializer):
+    usernames = serializers.ListField(
+        child=serializers.CharField(max_length=150), allow_empty=False, max_length=MAX_PROFILE_BATCH
+    )
+
+    def validate_usernames(self, value):
+        # dedupe, keeping the caller's order
+        return list(dict.fromkeys(value))
+
+class PresenceLookupSerializer(ProfileBatchSerializer):
+    pass
+
+class TypingSerializer(serializers.Serializer):
+    to = serializers.CharField(max_length=150)
+
+    def validate_to(self, value):
+        # typing state is keyed by recipient; unknown names would grow it without bound
+        if not User.objects.filter(username=value).exists():
+            raise serializers.ValidationError("No such user.")
+        return value
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    # schema only: UserViewSet.list builds these rows with values() (users/fastpath.py)
+    class Meta:
+        model = User
+        fields = ["id", "username", "email", "secondary_email", "batch", "is_current_student"]
+
+class UserPageSerializer(serializers.Serializer):
+    users = UserSummarySerializer(many=True)
+    next = serializers.IntegerField(allow_null=True, help_text="Pass as `after` for the next page; null on the last page")
+
 MAX_AVATAR_SIZE = 2 * 1024 * 1024  # 2 MB
 ALLOWED_AVATAR_TYPES = ["image/jpeg", "image/png", "image/webp"]
 
+class SparseFieldsMixin:
+    # ProfileSerializer(profile, fields=("headline", ...)) renders only those fields
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields).difference(fields):
+                self.fields.pop(name)
+
 class PublicProfileSerializer(serializers.ModelSerializer):
     # minimal public shape (no emails)
     username = serializers.CharField(source="user.username", read_only=True)
     full_name = serializers.CharField(source="user.full_name", read_only=True)
     avatar_url = serializers.SerializerMethodField(read_only=True)
+    online = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Profile
-        fields = ["username", "full_name", "headline", "about", "location", "experiences", "links", "avatar_url"]
+        fields = ["username", "full_name", "headline", "about", "location", "experiences", "links", "avatar_url", "online"]
+
+    def get_online(self, obj) -> bool:
+        return bool(presence.online([obj.user.username]))
 
     def get_avatar_url(self, obj):
         request = self.context.get("request")
@@ -43,7 +119,7 @@ class PublicProfileSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(f"/api/profile/{obj.user.username}/avatar/")
         return None
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # expose some fields from the user model and allow editing them
     username = serializers.CharField(source="user.username", required=False)
     email = serializers.EmailField(source="user.email", read_only=True)  # college email, read-only
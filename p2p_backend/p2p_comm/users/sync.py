@@ -0,0 +1,113 @@
+# users/sync.py
+"""
+Delta sync for client-side profile caches (GET /api/profile/changes/).
+
+Changed profiles (by updated_at) and removed usernames (ProfileTombstone, by
+created_at) are paged as one stream in time order: a page holds the oldest
+`limit` events of both kinds, so a username removed before someone else took it
+is never delivered after the new owner's card. Clients apply "removed" before
+"changes" within a page. The cursor is an opaque token holding the last
+(updated_at, id) and (created_at, id) a client has seen; it only ever moves forward.
+"""
+import base64
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .fastpath import public_profile_rows, serialize_public_profile
+from .models import Profile, ProfileTombstone
+
+# Rows saved in the last moment are held back until the next poll, so a
+# transaction that commits late with an older timestamp (or id) can't be skipped.
+SETTLE_DELAY = timedelta(seconds=2)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _ts(value):
+    return value.isoformat() if value else ""
+
+
+def encode_cursor(updated_at, profile_id, removed_at, tombstone_id):
+    raw = f"{_ts(updated_at)}|{profile_id}|{_ts(removed_at)}|{tombstone_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _parse_ts(ts):
+    value = parse_datetime(ts) if ts else None
+    if ts and value is None:
+        raise ValueError(ts)
+    return value
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        parts = raw.split("|")
+        if len(parts) == 3:
+            # cursor from before tombstones were ordered by time: resume after that tombstone's time
+            ts, profile_id, tombstone_id = parts
+            updated_at, tombstone_id = _parse_ts(ts), int(tombstone_id)
+            removed_at = (
+                ProfileTombstone.objects.filter(id=tombstone_id).values_list("created_at", flat=True).first()
+                or updated_at
+            )
+            return updated_at, int(profile_id), removed_at, tombstone_id
+        ts, profile_id, removed_ts, tombstone_id = parts
+        return _parse_ts(ts), int(profile_id), _parse_ts(removed_ts), int(tombstone_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(str(exc))
+
+
+def initial_cursor():
+    # a fresh client gets the full directory, so past tombstones are irrelevant to it
+    last = ProfileTombstone.objects.order_by("-created_at", "-id").values_list("created_at", "id").first()
+    return (None, 0) + (last or (None, 0))
+
+
+def _after(qs, field, ts, pk):
+    if ts is None:
+        return qs
+    return qs.filter(Q(**{f"{field}__gt": ts}) | Q(**{field: ts, "id__gt": pk}))
+
+
+def profile_changes(since, limit, prefix):
+    updated_at, profile_id, removed_at, tombstone_id = decode_cursor(since) if since else initial_cursor()
+    settled = timezone.now() - SETTLE_DELAY
+
+    qs = _after(Profile.objects.filter(updated_at__lte=settled), "updated_at", updated_at, profile_id)
+    rows = list(public_profile_rows(qs.order_by("updated_at", "id"), "id", "updated_at")[:limit + 1])
+    tombstones = _after(ProfileTombstone.objects.filter(created_at__lte=settled), "created_at", removed_at, tombstone_id)
+    tombstones = list(tombstones.order_by("created_at", "id").values("id", "username", "reason", "created_at")[:limit + 1])
+
+    # oldest `limit` events of both kinds; on a tie the removal comes first
+    events = heapq.merge(
+        ((t["created_at"], 0, t["id"], t) for t in tombstones),
+        ((r["updated_at"], 1, r["id"], r) for r in rows),
+    )
+    page = list(islice(events, limit))
+    has_more = len(rows) + len(tombstones) > len(page)
+
+    changes, removed = [], []
+    for _, kind, pk, item in page:
+        if kind:
+            card = serialize_public_profile(item, prefix)
+            card["updated_at"] = item["updated_at"]
+            changes.append(card)
+            updated_at, profile_id = item["updated_at"], pk
+        else:
+            removed.append({"username": item["username"], "reason": item["reason"], "removed_at": item["created_at"]})
+            removed_at, tombstone_id = item["created_at"], pk
+
+    return {
+        "changes": changes,
+        "removed": removed,
+        "cursor": encode_cursor(updated_at, profile_id, removed_at, tombstone_id),
+        "has_more": has_more,
+    }
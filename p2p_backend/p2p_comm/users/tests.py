@@ -1,3 +1,563 @@
-from django.test import TestCase
+import base64
+import io
+import os
+import re
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.contrib.auth.hashers import MD5PasswordHasher, make_password
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .cache import SQLiteCounterCache
+from .admin import CustomUserAdmin, EstimatedCountPaginator, mark_as_alumni
+from .fastpath import public_profile_rows, serialize_public_profiles
+from .models import CustomUser, Profile, ProfileViewHourly, RevokedToken, TokenWatermark
+from .renderers import ORJSONParser, ORJSONRenderer
+from .analytics import MAX_FLUSH_RETRIES, ProfileViewBuffer, profile_views
+from .presence import tracker as presence
+from .ratelimit import limiter, parse_rate
+from .revocation import BloomFilter, registry
+from .serializers import PublicProfileSerializer
+from .testutils import make_user
+
+
+class FastPathTests(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice", full_name="Alice Kumar")
+        Profile.objects.filter(user=self.alice).update(
+            headline="hi", experiences=[{"title": "Intern"}], avatar_blob=b"\x89PNG"
+        )
+        make_user("bob", full_name="Bob Singh")
+
+    def test_matches_public_profile_serializer(self):
+        request = RequestFactory().get("/")
+        qs = Profile.objects.select_related("user").order_by("user__username")
+        expected = PublicProfileSerializer(qs, many=True, context={"request": request}).data
+        self.assertEqual(serialize_public_profiles(public_profile_rows(qs), request), expected)
+
+    def test_orjson_round_trip(self):
+        payload = {"name": "Ālice\u2028", "n": [1, 2.5, None]}
+        body = ORJSONRenderer().render(payload)
+        self.assertNotIn(b"\xe2\x80\xa8", body)
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), payload)
+
+
+class ProfileEndpointTests(APITestCase):
+    def setUp(self):
+        make_user("alice", full_name="Alice Kumar")
+
+    def test_search_and_public_profile(self):
+        resp = self.client.get("/api/profile/search/", {"q": "alice"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([p["username"] for p in resp.json()], ["alice"])
+
+        resp = self.client.get("/api/profile/alice/")
+        self.assertEqual(resp.json()["full_name"], "Alice Kumar")
+        self.assertIsNone(resp.json()["avatar_url"])
+        self.assertEqual(self.client.get("/api/profile/nobody/").status_code, 404)
+
+    def test_batch_lookup(self):
+        make_user("bob", full_name="Bob Singh")
+        resp = self.client.post(
+            "/api/profile/batch/", {"usernames": ["bob", "alice", "bob", "ghost"]}, format="json"
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(set(resp.json()["profiles"]), {"alice", "bob"})
+        self.assertEqual(resp.json()["profiles"]["bob"]["full_name"], "Bob Singh")
+        self.assertEqual(resp.json()["missing"], ["ghost"])
+
+        too_many = {"usernames": [f"u{i}" for i in range(301)]}
+        self.assertEqual(self.client.post("/api/profile/batch/", too_many, format="json").status_code, 400)
+
+    def test_sparse_fieldsets_prune_payload_and_columns(self):
+        Profile.objects.filter(user__username="alice").update(about="long bio", avatar_blob=b"\x89PNG")
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/profile/alice/", {"fields": "avatar_url,headline"})
+        self.assertEqual(list(resp.json()), ["headline", "avatar_url"])
+        self.assertTrue(resp.json()["avatar_url"].endswith("/api/profile/alice/avatar/"))
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn('"about"', sql)
+        self.assertNotIn('"experiences"', sql)
+
+        resp = self.client.get("/api/profile/search/", {"q": "alice", "exclude": "about,experiences,links"})
+        self.assertEqual(list(resp.json()[0]), ["username", "full_name", "headline", "location", "avatar_url", "online"])
+
+        self.client.force_authenticate(CustomUser.objects.get(username="alice"))
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/profile/me/", {"fields": "email,avatar_url"})
+        self.assertEqual(resp.json(), {"email": "alice@iiitbh.ac.in", "avatar_url": "http://testserver/api/profile/alice/avatar/"})
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn('"about"', sql)
+        self.assertNotIn('"avatar_blob",', sql)  # only LENGTH("avatar_blob")
+        self.assertEqual(self.client.get("/api/profile/me/").json()["about"], "long bio")
+
+        self.assertEqual(self.client.get("/api/profile/alice/", {"fields": "email"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/profile/me/", {"fields": "email", "exclude": "about"}).status_code, 400)
+
+
+class SchemaCacheTests(APITestCase):
+    def setUp(self):
+        from p2p_comm.schema import clear_schema_cache
+        clear_schema_cache()
+        self.addCleanup(clear_schema_cache)
+
+    def test_schema_served_with_etag(self):
+        resp = self.client.get("/api/schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("/api/profile/search/", resp.json()["paths"])
+        etag = resp["ETag"]
+
+        resp = self.client.get("/api/schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+
+@mock.patch("users.sync.SETTLE_DELAY", timedelta(0))
+class ProfileChangesTests(APITestCase):
+    def changes(self, since=None, limit=100):
+        params = {"limit": limit}
+        if since:
+            params["since"] = since
+        resp = self.client.get("/api/profile/changes/", params)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()
+
+    def test_incremental_sync(self):
+        alice, bob = make_user("alice"), make_user("bob")
+        first = self.changes(limit=1)
+        self.assertEqual([c["username"] for c in first["changes"]], ["alice"])
+        self.assertTrue(first["has_more"])
+        second = self.changes(first["cursor"], limit=1)
+        self.assertEqual([c["username"] for c in second["changes"]], ["bob"])
+
+        # nothing new
+        idle = self.changes(second["cursor"])
+        self.assertEqual((idle["changes"], idle["removed"]), ([], []))
+
+        bob.username = "bobby"
+        bob.save()
+        alice.delete()
+        delta = self.changes(idle["cursor"])
+        self.assertEqual([c["username"] for c in delta["changes"]], ["bobby"])
+        self.assertEqual(
+            [(r["username"], r["reason"]) for r in delta["removed"]], [("bob", "renamed"), ("alice", "deleted")]
+        )
+
+    def test_removal_is_paged_before_a_later_reuse_of_the_username(self):
+        alice, bob = make_user("alice"), make_user("bob")
+        cursor = self.changes()["cursor"]
+        bob.username = "robert"
+        bob.save()
+        alice.username = "bob"  # takes the freed name afterwards
+        alice.save()
+
+        pages = []
+        while True:
+            page = self.changes(cursor, limit=1)
+            pages.append(([c["username"] for c in page["changes"]], [r["username"] for r in page["removed"]]))
+            cursor = page["cursor"]
+            if not page["has_more"]:
+                break
+        self.assertEqual(pages, [([], ["bob"]), (["robert"], []), ([], ["alice"]), (["bob"], [])])
+
+        # tombstones are held back for SETTLE_DELAY like profiles
+        alice.delete()
+        with mock.patch("users.sync.SETTLE_DELAY", timedelta(seconds=60)):
+            self.assertEqual(self.changes(cursor)["removed"], [])
+        self.assertEqual([r["username"] for r in self.changes(cursor)["removed"]], ["bob"])
+
+    def test_invalid_cursor(self):
+        resp = self.client.get("/api/profile/changes/", {"since": "not-a-cursor"})
+        self.assertEqual(resp.status_code, 400)
+        legacy = base64.urlsafe_b64encode(b"|0|0").decode()  # (updated_at, id, tombstone id) cursors still work
+        self.assertEqual(self.client.get("/api/profile/changes/", {"since": legacy}).status_code, 200)
+
+
+class AdminTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser("root", "root@iiitbh.ac.in", "pw")
+        self.client.force_login(self.admin)
+        for i in range(3):
+            make_user(f"s{i}", batch="2022")
+        make_user("junior", batch="2025")
+
+    def test_changelists_render_with_constant_queries(self):
+        # session, user, exact count (no estimate outside Postgres), one joined page query
+        with self.assertNumQueries(4):
+            self.assertEqual(self.client.get("/admin/users/profile/").status_code, 200)
+        self.assertEqual(self.client.get("/admin/users/customuser/", {"q": "s1"}).status_code, 200)
+
+    def test_count_is_exact_after_deletes(self):
+        CustomUser.objects.filter(username__in=["s1", "s2"]).delete()
+        with mock.patch.object(EstimatedCountPaginator, "exact_below", 1):
+            paginator = EstimatedCountPaginator(CustomUser.objects.order_by("-id"), 2)
+            self.assertEqual(paginator.count, CustomUser.objects.count())
+            self.assertTrue(paginator.page(paginator.num_pages).object_list)
+
+    def test_graduate_batch_is_single_update(self):
+        ids = list(CustomUser.objects.filter(batch="2022").values_list("pk", flat=True))
+        model_admin = CustomUserAdmin(CustomUser, site)
+        with mock.patch.object(CustomUserAdmin, "message_user"), self.assertNumQueries(1):
+            mark_as_alumni(model_admin, RequestFactory().post("/"), CustomUser.objects.filter(pk__in=ids))
+        self.assertEqual(CustomUser.objects.filter(batch="2022", is_current_student=True).count(), 0)
+        self.assertTrue(CustomUser.objects.get(username="junior").is_current_student)
+
+
+class TokenRevocationTests(APITestCase):
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        self.user = make_user("alice")
+
+    def login(self):
+        resp = self.client.post("/api/auth/login/", {"username": "alice", "password": "x"}, format="json")
+        return resp.json()
+
+    def me(self, access):
+        return self.client.get("/api/profile/me/", HTTP_AUTHORIZATION=f"Bearer {access}").status_code
+
+    def test_checks_do_not_query(self):
+        tokens = self.login()
+        self.me(tokens["access"])  # first request loads the revocation set
+        # only the view's own queries (user lookup, profile); nothing for revocation
+        with self.assertNumQueries(2):
+            self.assertEqual(self.me(tokens["access"]), 200)
+
+    def test_logout_revokes_access_and_refresh(self):
+        tokens = self.login()
+        resp = self.client.post(
+            "/api/auth/logout/", {"refresh": tokens["refresh"]}, format="json",
+            HTTP_AUTHORIZATION=f"Bearer {tokens['access']}",
+        )
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(self.me(tokens["access"]), 401)
+        resp = self.client.post("/api/auth/refresh/", {"refresh": tokens["refresh"]}, format="json")
+        self.assertEqual(resp.status_code, 401)
+
+    def test_password_change_revokes_older_tokens(self):
+        tokens = self.login()
+        with mock.patch("django.utils.timezone.now", return_value=timezone.now() + timedelta(seconds=2)):
+            self.user.set_password("new-password")
+            self.user.save()
+        self.assertEqual(self.me(tokens["access"]), 401)
+
+    def test_registration_and_hasher_upgrade_do_not_revoke(self):
+        resp = self.client.post("/api/auth/register/", {"college_email": "bob@iiitbh.ac.in"}, format="json")
+        self.assertEqual(resp.status_code, 201)
+
+        # alice's password stored with an outdated hasher; logging in re-hashes and saves it
+        CustomUser.objects.filter(pk=self.user.pk).update(password=make_password("x", hasher=MD5PasswordHasher()))
+        hashers = ["django.contrib.auth.hashers.PBKDF2PasswordHasher", "django.contrib.auth.hashers.MD5PasswordHasher"]
+        with override_settings(PASSWORD_HASHERS=hashers):
+            tokens = self.login()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$"))
+        self.assertFalse(TokenWatermark.objects.exists())
+        self.assertEqual(self.me(tokens["access"]), 200)
+
+    def test_logout_everywhere_covers_same_second_and_relogin_works(self):
+        old = self.login()
+        resp = self.client.post(
+            "/api/auth/logout/", {"everywhere": True}, format="json", HTTP_AUTHORIZATION=f"Bearer {old['access']}"
+        )
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(self.me(old["access"]), 401)  # issued in (or before) the watermark's second
+        fresh = self.login()  # waits into the next second if needed
+        self.assertGreater(AccessToken(fresh["access"])["iat"], int(TokenWatermark.objects.get().not_before.timestamp()))
+        self.assertEqual(self.me(fresh["access"]), 200)
+
+        RevokedToken.objects.create(jti="gone", expires_at=timezone.now() - timedelta(seconds=1))
+        call_command("purge_revoked_tokens", stdout=io.StringIO())
+        self.assertFalse(RevokedToken.objects.filter(jti="gone").exists())
+
+    def test_other_process_sees_revocation_after_sync(self):
+        tokens = self.login()
+        self.me(tokens["access"])
+        RevokedToken.objects.create(
+            jti=AccessToken(tokens["access"])["jti"], expires_at=timezone.now() + timedelta(hours=1)
+        )
+        self.assertEqual(self.me(tokens["access"]), 200)  # not synced yet
+        registry._next_sync = 0
+        self.assertEqual(self.me(tokens["access"]), 401)
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+        self.assertTrue(all(f"jti-{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(PRESENCE={"TTL": 60, "COALESCE": 15, "TYPING_TTL": 6, "PERSIST_INTERVAL": 3600})
+class PresenceTests(APITestCase):
+    def setUp(self):
+        presence.reset()
+        self.addCleanup(presence.reset)
+        self.alice, self.bob = make_user("alice"), make_user("bob")
+        self.client.force_authenticate(self.alice)
+
+    def test_heartbeat_lookup_and_expiry(self):
+        self.client.post("/api/presence/heartbeat/")
+        self.client.post("/api/presence/heartbeat/")
+        self.assertEqual(len(presence._heap), 1)  # second beat coalesced
+
+        resp = self.client.post("/api/presence/lookup/", {"usernames": ["alice", "bob"]}, format="json")
+        data = resp.json()["presence"]
+        self.assertTrue(data["alice"]["online"])
+        self.assertEqual(data["bob"], {"online": False, "last_seen": None})
+
+        later = time.monotonic() + 61
+        with mock.patch("users.presence.time.monotonic", return_value=later):
+            self.assertFalse(presence.lookup(["alice"])["alice"]["online"])
+        self.assertEqual(presence._heap, [])
+
+    def test_online_flag_on_profiles_and_search(self):
+        self.client.post("/api/presence/heartbeat/")
+        self.assertTrue(self.client.get("/api/profile/search/", {"q": "alice"}).json()[0]["online"])
+        self.assertFalse(self.client.get("/api/profile/search/", {"q": "bob"}).json()[0]["online"])
+        with self.assertNumQueries(1):  # presence is in memory; only the profile row is read
+            self.assertEqual(self.client.get("/api/profile/alice/", {"fields": "online"}).json(), {"online": True})
+        self.assertNotIn("online", self.client.get("/api/profile/alice/", {"exclude": "online"}).json())
+        with mock.patch("users.sync.SETTLE_DELAY", timedelta(0)):
+            # delta-sync cards are cached by clients, so they carry no presence
+            self.assertNotIn("online", self.client.get("/api/profile/changes/").json()["changes"][0])
+
+    def test_last_seen_written_behind(self):
+        presence.heartbeat("alice")
+        presence.heartbeat("bob")
+        self.assertIsNone(CustomUser.objects.get(username="alice").last_seen)
+        with self.assertNumQueries(1):
+            self.assertEqual(presence.flush(), 2)
+        self.assertIsNotNone(CustomUser.objects.get(username="alice").last_seen)
+
+    def test_typing(self):
+        self.client.post("/api/presence/typing/", {"to": "bob"}, format="json")
+        self.client.force_authenticate(self.bob)
+        self.assertEqual(self.client.get("/api/presence/typing/").json(), {"typing": ["alice"]})
+        with mock.patch("users.presence.time.monotonic", return_value=time.monotonic() + 7):
+            self.assertEqual(self.client.get("/api/presence/typing/").json(), {"typing": []})
+
+    def test_unknown_recipients_rejected_and_state_swept(self):
+        resp = self.client.post("/api/presence/typing/", {"to": "nobody"}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(presence._typing, {})
+
+        presence.typing("alice", "bob")
+        with mock.patch("users.presence.time.monotonic", return_value=time.monotonic() + 61):
+            presence.flush()
+        self.assertEqual((presence._typing, presence._last_seen), ({}, {}))
+        self.assertIsNotNone(presence.lookup(["alice"])["alice"]["last_seen"])  # read back from the DB
+
+    @override_settings(PRESENCE={"TTL": 60, "COALESCE": 15, "TYPING_TTL": 6, "PERSIST_INTERVAL": 0})
+    def test_due_flush_is_handed_off(self):
+        presence.reset()
+        with mock.patch("users.presence.flusher.submit") as submit, self.assertNumQueries(0):
+            presence.heartbeat("alice")
+        submit.assert_called_once_with(presence.flush)
+
+
+class ProfileViewCounterTests(APITestCase):
+    def setUp(self):
+        profile_views.reset()
+        self.addCleanup(profile_views.reset)
+        self.alice, self.bob = make_user("alice"), make_user("bob", full_name="Bob Singh")
+
+    def test_views_buffered_then_rolled_up(self):
+        self.client.get("/api/profile/alice/")  # anonymous
+        self.client.force_authenticate(self.bob)
+        with self.assertNumQueries(1):  # only the profile read
+            self.client.get("/api/profile/alice/")
+        self.client.get("/api/profile/alice/")
+        self.client.force_authenticate(self.alice)
+        self.client.get("/api/profile/alice/")  # own views aren't counted
+        self.assertEqual(profile_views.pending(), 3)
+
+        stats = self.client.get("/api/profile/me/views/").json()
+        self.assertEqual(stats["total"], 0)  # not flushed yet
+
+        with self.assertNumQueries(4):  # one upsert per rollup table, inside a savepoint
+            profile_views.flush()
+        profile_views.flush()  # empty flush is a no-op
+        stats = self.client.get("/api/profile/me/views/").json()
+        self.assertEqual(stats["total"], 3)
+        self.assertEqual(sum(d["views"] for d in stats["daily"]), 3)
+        self.assertEqual([(v["username"], v["views"]) for v in stats["viewers"]], [("bob", 2)])
+
+        self.client.force_authenticate(self.bob)
+        self.client.get("/api/profile/alice/")
+        profile_views.flush()
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.get("/api/profile/me/views/").json()["total"], 4)
+
+    @override_settings(PROFILE_VIEW_COUNTERS={"FLUSH_INTERVAL": 30, "FLUSH_SIZE": 1})
+    def test_due_flush_is_handed_off(self):
+        profile_views.reset()
+        with mock.patch("users.analytics.flusher.submit") as submit, self.assertNumQueries(1):
+            self.client.get("/api/profile/alice/")  # only the profile read; the write is not inline
+        submit.assert_called_once_with(profile_views.flush)
+
+
+class ProfileViewFlushTests(TransactionTestCase):
+    # real commits: SQLite checks the rollup foreign keys only at COMMIT
+    def setUp(self):
+        profile_views.reset()
+        self.addCleanup(profile_views.reset)
+        self.alice, self.bob = make_user("alice"), make_user("bob")
+
+    def test_deleted_profile_dropped_and_transient_errors_capped(self):
+        gone = make_user("gone")
+        profile_views.record(gone.profile.pk, self.bob.pk)
+        profile_views.record(self.alice.profile.pk, self.bob.pk)
+        gone.delete()
+        profile_views.flush()
+        self.assertEqual(profile_views.pending(), 0)
+        self.assertEqual(ProfileViewHourly.objects.get().profile_id, self.alice.profile.pk)
+
+        profile_views.record(self.alice.profile.pk)
+        locked = mock.patch.object(ProfileViewBuffer, "_write", side_effect=OperationalError("database is locked"))
+        with locked, self.assertLogs("users.analytics", "WARNING") as logs:
+            for _ in range(MAX_FLUSH_RETRIES):
+                profile_views.flush()
+                self.assertEqual(profile_views.pending(), 1)  # kept for the next flush
+            profile_views.flush()
+        self.assertEqual(profile_views.pending(), 0)  # given up
+        self.assertIn("dropping 1 views", logs.output[-1])
+
+
+class RateLimitTests(APITestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.location = os.path.join(tmp.name, "ratelimit.sqlite3")
+        overrides = override_settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "ratelimit": {"BACKEND": "users.cache.SQLiteCounterCache", "LOCATION": self.location},
+            },
+            RATELIMITS={"CACHE": "ratelimit", "SCOPES": {"login": {"ip": "5/m", "data:username": "3/m"}}},
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        caches["ratelimit"].clear()
+        limiter.reset()
+        self.addCleanup(limiter.reset)
+        make_user("alice")
+
+    def login(self, username):
+        return self.client.post("/api/auth/login/", {"username": username, "password": "wrong"}, format="json")
+
+    def test_counter_cache_is_shared_and_atomic(self):
+        a, b = SQLiteCounterCache(self.location, {}), SQLiteCounterCache(self.location, {})
+        self.assertTrue(a.add("k", 1, timeout=60))
+        self.assertFalse(b.add("k", 5, timeout=60))
+        self.assertEqual([b.incr("k"), a.incr("k", 3)], [2, 5])
+        with self.assertRaises(ValueError):
+            a.incr("missing")
+        a.set("obj", {"x": [1]}, timeout=60)
+        self.assertEqual(b.get_many(["k", "obj", "missing"]), {"k": 5, "obj": {"x": [1]}})
+        a.set("old", 1, timeout=-1)
+        self.assertIsNone(b.get("old"))
+        self.assertTrue(b.add("old", 2, timeout=60))  # expired keys can be added again
+
+    def test_login_limited_per_username_then_ip(self):
+        for _ in range(3):
+            self.assertEqual(self.login("Alice").status_code, 401)
+        resp = self.login("alice ")
+        self.assertEqual(resp.status_code, 429)
+        self.assertGreater(int(resp["Retry-After"]), 0)
+
+        # blocked keys are rejected locally, without touching the shared store
+        with mock.patch.object(SQLiteCounterCache, "incr") as incr:
+            self.assertEqual(self.login("alice").status_code, 429)
+        incr.assert_not_called()
+
+        self.assertEqual(self.login("bob").status_code, 401)
+        self.assertEqual(self.login("carol").status_code, 429)  # 6th request from this IP
+
+    def test_spoofed_forwarded_for_shares_the_ip_limit(self):
+        for i in range(5):
+            self.assertEqual(self.client.post(
+                "/api/auth/login/", {"username": f"u{i}", "password": "wrong"}, format="json",
+                HTTP_X_FORWARDED_FOR=f"10.0.0.{i}",
+            ).status_code, 401)
+        resp = self.client.post(
+            "/api/auth/login/", {"username": "u5", "password": "wrong"}, format="json", HTTP_X_FORWARDED_FOR="10.0.0.5"
+        )
+        self.assertEqual(resp.status_code, 429)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("10/m"), (10, 60))
+        self.assertEqual(parse_rate("100/15m"), (100, 900))
+
+
+class QueryPlanTests(APITestCase):
+    """
+    EXPLAIN every SELECT the key endpoints run against a seeded dataset; none may scan a whole table.
+    Walking a whole index ("SCAN ... USING INDEX" / "Index Scan") is allowed: search's substring
+    match has to, and it stops early at LIMIT. Only table scans without an index fail.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_users", 500, "--chunk-size", "200", stdout=io.StringIO())
+        cls.admin = CustomUser.objects.create_superuser("root", "root@iiitbh.ac.in", "pw")
+        cls.sample = CustomUser.objects.exclude(pk=cls.admin.pk).order_by("-id").first()
+
+    def setUp(self):
+        profile_views.reset()
+        self.addCleanup(profile_views.reset)
+
+    def plans(self, method, path, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            getattr(self.client, method)(path, data, format="json" if method == "post" else None)
+        selects = [q["sql"] for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith("SELECT")]
+        self.assertTrue(selects)
+        prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            plans = {}
+            for sql in selects:
+                cursor.execute(f"{prefix} {sql}")
+                plans[sql] = "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+        return plans
+
+    def assertNoFullScans(self, plans):
+        # SQLite: "SCAN users_customuser" with nothing after it (no USING INDEX); PostgreSQL: "Seq Scan on ..."
+        full_scan = re.compile(r"\bSCAN \w+$|Seq Scan on", re.MULTILINE)
+        for sql, plan in plans.items():
+            self.assertIsNone(full_scan.search(plan), f"full table scan in:\n{sql}\n{plan}")
+
+    def test_search(self):
+        plans = self.plans("get", "/api/profile/search/", {"q": self.sample.full_name.split()[1].lower()})
+        self.assertNoFullScans(plans)
+        # rows come off the (full_name, username) index in order, so LIMIT stops the walk early
+        self.assertNotIn("TEMP B-TREE", "".join(plans.values()))
+
+    def test_public_profile_by_username(self):
+        self.assertNoFullScans(self.plans("get", f"/api/profile/{self.sample.username}/"))
+
+    def test_registration_email_check(self):
+        plans = self.plans("post", "/api/auth/register/", {"college_email": self.sample.email.upper()})
+        self.assertNoFullScans(plans)
+        self.assertTrue(any("user_email_lower_idx" in plan for plan in plans.values()))
+
+    def test_user_list(self):
+        self.client.force_authenticate(self.admin)
+        self.assertNoFullScans(self.plans("get", "/api/users/"))  # the default request, no after/limit
+        self.assertNoFullScans(self.plans("get", "/api/users/", {"after": self.sample.pk - 50, "limit": 20}))
+
+        # always one page plus a cursor, until the last page
+        ids = list(CustomUser.objects.order_by("id").values_list("id", flat=True))
+        first = self.client.get("/api/users/").json()
+        self.assertEqual(([u["id"] for u in first["users"]], first["next"]), (ids[:100], ids[99]))
+        rest = self.client.get("/api/users/", {"after": first["next"], "limit": 1000}).json()
+        self.assertEqual(([u["id"] for u in rest["users"]], rest["next"]), (ids[100:], None))
@@ -0,0 +1,8 @@
+# users/testutils.py
+"""Helpers shared by the apps' test suites."""
+from .models import CustomUser
+
+
+def make_user(username, **extra):
+    extra.setdefault("email", f"{username}@iiitbh.ac.in")
+    return CustomUser.objects.create_user(username=username, password="x", **extra)
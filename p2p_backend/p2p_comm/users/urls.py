@@ -1,8 +1,13 @@
 # users/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserViewSet, RegistrationAPIView, MeProfileView, PublicProfileView, profile_avatar_view, ProfileSearchView
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .views import (
+    UserViewSet, RegistrationAPIView, LoginView, LogoutView,
+    MeProfileView, PublicProfileView, profile_avatar_view, ProfileSearchView, ProfileBatchView, ProfileChangesView,
+    MeProfileViewsView,
+    PresenceHeartbeatView, PresenceLookupView, TypingView,
+)
+from rest_framework_simplejwt.views import TokenRefreshView
 
 router = DefaultRouter()
 router.register(r"users", UserViewSet, basename="user")
@@ -10,12 +15,21 @@ router.register(r"users", UserViewSet, basename="user")
 urlpatterns = [
     path("", include(router.urls)),
     path("auth/register/", RegistrationAPIView.as_view(), name="api-register"),
-    path("auth/login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("auth/login/", LoginView.as_view(), name="token_obtain_pair"),
     path("auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("auth/logout/", LogoutView.as_view(), name="api-logout"),
 
-    path("profile/<str:username>/", PublicProfileView.as_view(), name="profile-public"),
+    # fixed paths must come before the <username> catch-all
     path("profile/search/", ProfileSearchView.as_view(), name="profile-search"),
     path("profile/me/", MeProfileView.as_view(), name="profile-me"),
+    path("profile/me/views/", MeProfileViewsView.as_view(), name="profile-me-views"),
+    path("profile/batch/", ProfileBatchView.as_view(), name="profile-batch"),
+    path("profile/changes/", ProfileChangesView.as_view(), name="profile-changes"),
+    path("profile/<str:username>/", PublicProfileView.as_view(), name="profile-public"),
     path("profile/<str:username>/avatar/", profile_avatar_view, name="profile-avatar"),
+
+    path("presence/heartbeat/", PresenceHeartbeatView.as_view(), name="presence-heartbeat"),
+    path("presence/lookup/", PresenceLookupView.as_view(), name="presence-lookup"),
+    path("presence/typing/", TypingView.as_view(), name="presence-typing"),
 ]
 
@@ -2,6 +2,7 @@
 import random
 import string
 from django.contrib.auth import get_user_model
+from django.db import connections, router
 
 User = get_user_model()
 
@@ -23,3 +24,37 @@ def make_username_from_email(email: str) -> str:
 def make_random_password(length=12):
     chars = string.ascii_letters + string.digits + "!@#$%^&*()"
     return "".join(random.choices(chars, k=length))
+
+def bulk_upsert_increment(model, key_fields, count_field, rows, batch_size=500):
+    """
+    Add counts onto rows identified by key_fields, inserting missing rows:
+    INSERT ... ON CONFLICT (keys) DO UPDATE SET count = count + excluded.count.
+    `rows` is an iterable of (key values tuple, increment). The keys must be
+    covered by a unique constraint. Works on SQLite (3.24+) and Postgres.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    db = router.db_for_write(model)
+    connection = connections[db]
+    qn = connection.ops.quote_name
+    fields = [model._meta.get_field(name) for name in key_fields]
+    count = model._meta.get_field(count_field)
+    table = qn(model._meta.db_table)
+    columns = [qn(f.column) for f in fields] + [qn(count.column)]
+    keys = ", ".join(columns[:-1])
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    c = columns[-1]
+
+    with connection.cursor() as cursor:
+        for i in range(0, len(rows), batch_size):
+            chunk = rows[i:i + batch_size]
+            params = []
+            for key, increment in chunk:
+                params.extend(f.get_db_prep_save(v, connection) for f, v in zip(fields, key))
+                params.append(increment)
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([placeholders] * len(chunk))} "
+                f"ON CONFLICT ({keys}) DO UPDATE SET {c} = {table}.{c} + excluded.{c}",
+                params,
+            )
@@ -5,10 +5,27 @@ from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from rest_framework.decorators import action
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
 from django.core.mail import send_mail
 
-from .serializers import RegistrationSerializer, ProfileSerializer, PublicProfileSerializer
+from .serializers import (
+    RegistrationSerializer, ProfileSerializer, PublicProfileSerializer, ProfileBatchSerializer, LogoutSerializer,
+    PresenceLookupSerializer, TypingSerializer, UserPageSerializer,
+)
+from .presence import tracker as presence
+from .analytics import profile_views, profile_view_stats
+from .revocation import registry
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from .models import Profile
+from .fastpath import (
+    public_profile_rows, serialize_public_profile, serialize_public_profiles, avatar_url_prefix, serialize_users,
+    profile_card_rows, serialize_profile_card, online_usernames, PUBLIC_PROFILE_FIELDS,
+)
+from .fieldsets import ME_PROFILE_FIELDS, fieldset_parameters, me_profile, requested_fields
+from .renderers import ORJSONParser
+from .ratelimit import SlidingWindowThrottle
+from .sync import profile_changes
+from rest_framework.exceptions import ValidationError
 from .utils import make_username_from_email, make_random_password
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
@@ -25,6 +42,9 @@ User = get_user_model()
 
 class RegistrationAPIView(APIView):
     permission_classes = [permissions.AllowAny]
+    # each registration sends an email; limits in settings.RATELIMITS["SCOPES"]["register"]
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = "register"
 
     @extend_schema(
         summary="Register a new student (college email required)",
@@ -33,7 +53,8 @@ class RegistrationAPIView(APIView):
         request=RegistrationSerializer,
         responses={
             201: OpenApiResponse(description="Registered. Credentials emailed to college email."),
-            400: OpenApiResponse(description="Validation error")
+            400: OpenApiResponse(description="Validation error"),
+            429: OpenApiResponse(description="Too many registrations from this IP or for this email"),
         },
         tags=["Auth"],
         examples=[
@@ -79,6 +100,37 @@ class RegistrationAPIView(APIView):
             headers={"Location": "/api/auth/login/"}
         )
 
+class LoginView(TokenObtainPairView):
+    """TokenObtainPairView with per-IP and per-username limits (each attempt costs a PBKDF2 hash)."""
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = "login"
+
+class LogoutView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Log out (revoke tokens)",
+        description="Revokes the access token used for this request and, if given, the refresh token. "
+                    "With everywhere=true every token issued to the user so far is revoked.",
+        request=LogoutSerializer,
+        responses={204: OpenApiResponse(description="Logged out"), 400: OpenApiResponse(description="Validation error")},
+        tags=["Auth"],
+    )
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh = serializer.validated_data.get("refresh")
+        if refresh is not None and str(refresh.payload.get(jwt_settings.USER_ID_CLAIM)) != str(request.user.pk):
+            return Response({"refresh": ["Token belongs to another user."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        if serializer.validated_data["everywhere"]:
+            registry.revoke_user(request.user.pk)
+        else:
+            registry.revoke_token(request.auth)
+            if refresh is not None:
+                registry.revoke_token(refresh)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 # class CompleteProfileView(APIView):
 #     permission_classes = [permissions.IsAuthenticated]
 
@@ -101,17 +153,33 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
 
     @extend_schema(
         summary="List users (admin only)",
-        description="Return a list of users. Accessible only to staff accounts.",
-        responses={200: OpenApiResponse(description="List of users"), 403: OpenApiResponse(description="Not allowed")},
+        description="Return one page of users, oldest first. Accessible only to staff accounts. "
+                    "Pass `next` back as `after` for the following page; it is null on the last one.",
+        parameters=[
+            OpenApiParameter(name="after", description="Cursor from a previous page's `next`", required=False, type=int),
+            OpenApiParameter(name="limit", description="Page size (default 100, max 1000)", required=False, type=int),
+        ],
+        responses={
+            200: UserPageSerializer,
+            400: OpenApiResponse(description="Invalid after/limit"),
+            403: OpenApiResponse(description="Not allowed"),
+        },
         tags=["Users"],
     )
     def list(self, request):
         # minimal user list for admins
         if not request.user.is_staff:
             return Response({"detail":"Not allowed"}, status=status.HTTP_403_FORBIDDEN)
-        qs = self.get_queryset()
-        data = [{"id":u.id, "username":u.username, "email":u.email, "secondary_email":u.secondary_email, "batch":u.batch, "is_current_student":u.is_current_student} for u in qs]
-        return Response(data)
+        try:
+            limit = min(max(int(request.query_params.get("limit", 100)), 1), 1000)
+            after = int(request.query_params.get("after") or 0)
+        except ValueError:
+            raise ValidationError({"detail": "after and limit must be integers."})
+        # keyset page: a primary-key range seek, never a scan of the whole table
+        users = serialize_users(self.get_queryset().filter(id__gt=after).order_by("id")[:limit + 1])
+        has_more = len(users) > limit
+        users = users[:limit]
+        return Response({"users": users, "next": users[-1]["id"] if has_more else None})
     
     @extend_schema(
         summary="Retrieve user (self or admin)",
@@ -139,17 +207,18 @@ class MeProfileView(APIView):
     Accepts JSON or multipart (for avatar)
     """
     permission_classes = [IsAuthenticated]
-    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    parser_classes = [ORJSONParser, MultiPartParser, FormParser]
 
     @extend_schema(
         summary="Get current user's profile",
-        description="Returns the authenticated user's profile.",
-        responses={200: ProfileSerializer},
+        description="Returns the authenticated user's profile. `fields`/`exclude` trim the response and the query.",
+        parameters=fieldset_parameters(ME_PROFILE_FIELDS),
+        responses={200: ProfileSerializer, 400: OpenApiResponse(description="Unknown field")},
         tags=["Profile"]
     )
     def get(self, request, *args, **kwargs):
-        profile, _ = Profile.objects.get_or_create(user=request.user)
-        serializer = ProfileSerializer(profile)
+        fields = requested_fields(request, ME_PROFILE_FIELDS)
+        serializer = ProfileSerializer(me_profile(request.user, fields), fields=fields, context={"request": request})
         return Response(serializer.data)
     
     @extend_schema(
@@ -169,6 +238,28 @@ class MeProfileView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class MeProfileViewsView(APIView):
+    """
+    GET /api/profile/me/views/?days=7 -> who viewed the current user's profile.
+    Read from hourly rollups; counts lag real time by up to one flush interval.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Profile view stats for the current user",
+        parameters=[OpenApiParameter(name="days", description="Window in days (default 7, max 90)", required=False, type=int)],
+        responses={200: OpenApiResponse(description='{"days", "total", "daily": [{day, views}], "viewers": [card + views, last_viewed]}')},
+        tags=["Profile"],
+    )
+    def get(self, request):
+        try:
+            days = min(max(int(request.query_params.get("days", 7)), 1), 90)
+        except ValueError:
+            raise ValidationError({"days": "Must be an integer."})
+        profile, _ = Profile.objects.get_or_create(user=request.user)
+        return Response(profile_view_stats(profile.pk, days, avatar_url_prefix(request)))
+
+
 class PublicProfileView(RetrieveAPIView):
     permission_classes = [AllowAny]
     serializer_class = PublicProfileSerializer   # use public serializer here
@@ -182,11 +273,31 @@ class PublicProfileView(RetrieveAPIView):
 
     @extend_schema(
         summary="Get public profile by username",
-        responses={200: PublicProfileSerializer, 404: OpenApiResponse(description="Not found")},
+        description="`fields`/`exclude` trim the response and the query. `online` is live presence (no query).",
+        parameters=fieldset_parameters(PUBLIC_PROFILE_FIELDS),
+        responses={
+            200: PublicProfileSerializer,
+            400: OpenApiResponse(description="Unknown field"),
+            404: OpenApiResponse(description="Not found"),
+        },
         tags=["Profile"],
     )
     def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+        fields = requested_fields(request, PUBLIC_PROFILE_FIELDS)
+        # fast path: one joined values() query, no blob, no serializer
+        rows = public_profile_rows(
+            Profile.objects.filter(user__username=kwargs.get("username")), "id", "user_id", fields=fields
+        )
+        row = rows.first()
+        if row is None:
+            # user without a profile row yet (or unknown user -> 404)
+            self.get_object()
+            row = rows.first()
+        # buffered in memory, written to the rollup tables in bulk
+        viewer_id = request.user.pk if request.user.is_authenticated else None
+        if viewer_id != row["user_id"]:
+            profile_views.record(row["id"], viewer_id)
+        return Response(serialize_public_profile(row, avatar_url_prefix(request), fields, online_usernames([row], fields)))
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
@@ -201,14 +312,17 @@ class ProfileSearchView(ListAPIView):
     """
     permission_classes = [AllowAny]
     serializer_class = PublicProfileSerializer
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = "search"
 
     @extend_schema(
         summary="Search public profiles by full name or username",
         parameters=[
             OpenApiParameter(name="q", description="Full name or username (substring, case-insensitive)", required=True, type=str),
             OpenApiParameter(name="limit", description="Max results (default 20, max 50)", required=False, type=int),
+            *fieldset_parameters(PUBLIC_PROFILE_FIELDS),
         ],
-        responses={200: PublicProfileSerializer(many=True)},
+        responses={200: PublicProfileSerializer(many=True), 400: OpenApiResponse(description="Unknown field"), 429: OpenApiResponse(description="Too many searches")},
         tags=["Profile"],
     )
     def get_queryset(self):
@@ -223,11 +337,136 @@ class ProfileSearchView(ListAPIView):
         ).order_by("user__full_name", "user__username")[:limit]
         return qs
 
+    def list(self, request, *args, **kwargs):
+        fields = requested_fields(request, PUBLIC_PROFILE_FIELDS)
+        rows = public_profile_rows(self.get_queryset(), fields=fields)
+        return Response(serialize_public_profiles(rows, request, fields))
+
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx["request"] = self.request
         return ctx
 
+class ProfileBatchView(APIView):
+    """
+    POST /api/profile/batch/  {"usernames": [...]}
+    Resolves many public profile cards in one query (one joined SELECT, avatar blobs never loaded).
+    """
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        summary="Batch lookup of public profile cards",
+        description="Resolve up to 300 usernames at once. Duplicates are ignored. "
+                    "Returns a map of username -> card plus the usernames that were not found.",
+        request=ProfileBatchSerializer,
+        responses={
+            200: OpenApiResponse(description='{"profiles": {username: {username, full_name, headline, avatar_url}}, "missing": [...]}'),
+            400: OpenApiResponse(description="Validation error"),
+        },
+        tags=["Profile"],
+        examples=[
+            OpenApiExample("Example request", value={"usernames": ["alice.x1y2", "bob.a9b8"]}, request_only=True),
+        ],
+    )
+    def post(self, request):
+        serializer = ProfileBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        usernames = serializer.validated_data["usernames"]
+
+        prefix = avatar_url_prefix(request)
+        rows = profile_card_rows(Profile.objects.filter(user__username__in=usernames))
+        profiles = {row["user__username"]: serialize_profile_card(row, prefix) for row in rows}
+        return Response({
+            "profiles": profiles,
+            "missing": [u for u in usernames if u not in profiles],
+        })
+
+class ProfileChangesView(APIView):
+    """
+    GET /api/profile/changes/?since=<cursor>&limit=<n>
+    Incremental directory sync: profiles changed and usernames removed since the cursor.
+    Clients apply "removed" before "changes" and keep polling with the returned cursor.
+    """
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        summary="Delta sync of public profiles",
+        description="Returns public profiles changed and usernames removed (by deletion or rename) since `since`, "
+                    "paged together in time order, plus a new cursor and `has_more`. Apply `removed` before "
+                    "`changes`. Omit `since` for a full sync.",
+        parameters=[
+            OpenApiParameter(name="since", description="Cursor from a previous response", required=False, type=str),
+            OpenApiParameter(name="limit", description="Max items per list (default 100, max 500)", required=False, type=int),
+        ],
+        responses={
+            200: OpenApiResponse(description='{"changes": [...], "removed": [{username, reason, removed_at}], "cursor": str, "has_more": bool}'),
+            400: OpenApiResponse(description="Invalid cursor"),
+        },
+        tags=["Profile"],
+    )
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get("limit", 100)), 1), 500)
+            data = profile_changes(request.query_params.get("since"), limit, avatar_url_prefix(request))
+        except ValueError:  # InvalidCursor or a non-integer limit
+            raise ValidationError({"since": "Invalid cursor or limit."})
+        return Response(data)
+
+class PresenceHeartbeatView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Presence heartbeat",
+        description="Marks the current user online. Clients call this every ~30s while active.",
+        request=None,
+        responses={204: OpenApiResponse(description="Recorded")},
+        tags=["Presence"],
+    )
+    def post(self, request):
+        presence.heartbeat(request.user.username)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PresenceLookupView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Batch presence lookup",
+        description="Online state and last_seen for up to 300 usernames, answered from memory.",
+        request=PresenceLookupSerializer,
+        responses={200: OpenApiResponse(description='{"presence": {username: {"online": bool, "last_seen": datetime|null}}}')},
+        tags=["Presence"],
+    )
+    def post(self, request):
+        serializer = PresenceLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({"presence": presence.lookup(serializer.validated_data["usernames"])})
+
+
+class TypingView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Who is typing to me",
+        responses={200: OpenApiResponse(description='{"typing": [username, ...]}')},
+        tags=["Presence"],
+    )
+    def get(self, request):
+        return Response({"typing": presence.typing_to(request.user.username)})
+
+    @extend_schema(
+        summary="Send a typing indicator",
+        description="Shows the current user as typing to `to` for a few seconds (also counts as a heartbeat).",
+        request=TypingSerializer,
+        responses={204: OpenApiResponse(description="Recorded")},
+        tags=["Presence"],
+    )
+    def post(self, request):
+        serializer = TypingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        presence.typing(request.user.username, serializer.validated_data["to"])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 # Serve avatar binary from DB. Public or protected depending on your policy (here we keep public)
 @extend_schema(
     summary="Get user's avatar image",